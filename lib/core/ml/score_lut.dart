@@ -0,0 +1,84 @@
+import 'dart:convert';
+import 'dart:typed_data';
+import 'package:flutter/services.dart';
+
+// Quantized impulse-score table exported by python/score_lut.py.
+// Scoring is one binary search per axis plus a single array index.
+class ScoreLut {
+  final List<String> axes;
+  final List<List<double>> edges;
+  final List<int> strides;
+  final Uint8List table;
+  final int quantLevels;
+  final Map<String, int> categoryMap;
+  final double anomalyDefault;
+
+  ScoreLut({
+    required this.axes,
+    required this.edges,
+    required this.strides,
+    required this.table,
+    required this.quantLevels,
+    required this.categoryMap,
+    required this.anomalyDefault,
+  });
+
+  factory ScoreLut.fromAssets(Map<String, dynamic> meta, Uint8List table) {
+    final axisMeta = (meta['axes'] as List).cast<Map<String, dynamic>>();
+    final shape = (meta['shape'] as List).cast<int>();
+    final strides = List<int>.filled(shape.length, 1);
+    for (int i = shape.length - 2; i >= 0; i--) {
+      strides[i] = strides[i + 1] * shape[i + 1];
+    }
+    return ScoreLut(
+      axes: axisMeta.map((a) => a['feature'] as String).toList(),
+      edges: axisMeta
+          .map((a) => (a['edges'] as List)
+              .map((e) => (e as num).toDouble())
+              .toList())
+          .toList(),
+      strides: strides,
+      table: table,
+      quantLevels: meta['quant_levels'] as int,
+      categoryMap: (meta['category_map'] as Map).cast<String, int>(),
+      anomalyDefault: (meta['anomaly_score_default'] as num).toDouble(),
+    );
+  }
+
+  // Returns null when no table was exported or it failed the error gate
+  static Future<ScoreLut?> load() async {
+    try {
+      final meta = jsonDecode(
+          await rootBundle.loadString('assets/models/score_lut.json'));
+      final data = await rootBundle.load('assets/models/score_lut.bin');
+      return ScoreLut.fromAssets(
+        meta as Map<String, dynamic>,
+        data.buffer.asUint8List(data.offsetInBytes, data.lengthInBytes),
+      );
+    } catch (_) {
+      return null;
+    }
+  }
+
+  double score(Map<String, double> features) {
+    int index = 0;
+    for (int a = 0; a < axes.length; a++) {
+      index += _bin(edges[a], features[axes[a]] ?? 0) * strides[a];
+    }
+    return table[index] / quantLevels;
+  }
+
+  // Count of edges <= x, matching numpy searchsorted(side="right")
+  static int _bin(List<double> e, double x) {
+    int lo = 0, hi = e.length;
+    while (lo < hi) {
+      final mid = (lo + hi) >> 1;
+      if (e[mid] <= x) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    return lo;
+  }
+}
@@ -1,10 +1,18 @@
 import 'dart:math';
 import 'package:uuid/uuid.dart';
 import '../models/transaction.dart';
+import '../ml/score_lut.dart';
+import 'impulse_rules.dart';
 
 class DataService {
   static final _uuid = Uuid();
   static final _random = Random(42);
+  static ScoreLut? _scoreLut;
+
+  // Load the exported score table; scoring falls back to heuristics without it
+  static Future<void> init() async {
+    _scoreLut = await ScoreLut.load();
+  }
 
   static const _categories = [
     'Food & Dining',
@@ -119,27 +127,31 @@ class DataService {
     required double avgSpend,
     required String archetype,
   }) {
-    double score = 0;
     final isLateNight = hour >= 23 || hour <= 3;
     final isEOM = day >= 26;
-    final isImpulseCat = [
-      'Fashion',
-      'Gaming',
-      'Entertainment',
-      'Alcohol',
-      'Electronics'
-    ].contains(category);
-
-    if (isLateNight) score += 0.25;
-    if (isEOM) score += 0.15;
-    if (isImpulseCat) score += 0.25;
-    if (amount > avgSpend * 2) score += 0.20;
-    if (archetype == 'night_owl' && isLateNight) score += 0.10;
-    if (archetype == 'eom_spender' && isEOM) score += 0.10;
-    if (archetype == 'freq_binger') score += 0.08;
-
-    score += (_random.nextDouble() - 0.5) * 0.1;
-    return score.clamp(0.0, 1.0);
+
+    // Demo transactions carry no history, so the history rules stay quiet
+    final score = impulseRuleScore({
+          'is_late_night': isLateNight ? 1 : 0,
+          'is_end_of_month': isEOM ? 1 : 0,
+          'category': category,
+          'spending_velocity': 0,
+          'category_switch_count': 1,
+          'amount': amount,
+          'avg_user_spend': avgSpend,
+          'transaction_gap_minutes': 999,
+        }, archetype) +
+        impulseNoiseMean +
+        _gaussian() * impulseNoiseStd;
+
+    // Map onto 0..1 so the label threshold lands on the app's 0.5 cut-off
+    return (score / (2 * impulseThreshold)).clamp(0.0, 1.0);
+  }
+
+  static double _gaussian() {
+    final u1 = 1 - _random.nextDouble();
+    final u2 = _random.nextDouble();
+    return sqrt(-2 * log(u1)) * cos(2 * pi * u2);
   }
 
   // Generate simulation transaction
@@ -152,14 +164,17 @@ class DataService {
   }) {
     final now = DateTime.now();
     final h = hour ?? now.hour;
-    final impulseScore = _computeImpulseScore(
-      hour: h,
-      day: now.day,
-      category: category,
-      amount: amount,
-      avgSpend: avgSpend,
-      archetype: archetype,
-    );
+    final lut = _scoreLut;
+    final impulseScore = lut != null
+        ? lut.score(_lutFeatures(lut, now, h, category, amount, avgSpend))
+        : _computeImpulseScore(
+            hour: h,
+            day: now.day,
+            category: category,
+            amount: amount,
+            avgSpend: avgSpend,
+            archetype: archetype,
+          );
     return Transaction(
       id: _uuid.v4(),
       userId: 'U0001',
@@ -171,4 +186,29 @@ class DataService {
       archetype: archetype,
     );
   }
+
+  // Model inputs for a single simulated purchase. History-based features
+  // assume an isolated transaction: no recent velocity, no recent switch.
+  static Map<String, double> _lutFeatures(ScoreLut lut, DateTime now, int hour,
+      String category, double amount, double avgSpend) {
+    final isLateNight = hour >= 23 || hour <= 3;
+    final isWeekend = now.weekday >= 6;
+    final isImpulseCat =
+        impulseSets['impulse_categories']!.contains(category);
+    return {
+      'hour': hour.toDouble(),
+      'day_of_week': (now.weekday - 1).toDouble(),
+      'day_of_month': now.day.toDouble(),
+      'spending_velocity': 0,
+      'gap_normalized': 1.0,
+      'category_switch_count': 1,
+      'mood_proxy_score': 0.4 * (isLateNight ? 1 : 0) +
+          0.3 * (isWeekend ? 1 : 0) +
+          0.3 * (isImpulseCat ? 1 : 0) +
+          0.1,
+      'spend_ratio': amount / avgSpend,
+      'category_encoded': (lut.categoryMap[category] ?? 0).toDouble(),
+      'anomaly_score': lut.anomalyDefault,
+    };
+  }
 }
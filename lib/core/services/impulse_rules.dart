@@ -0,0 +1,78 @@
+// GENERATED by python/label_rules.py from python/rules/impulse_rules.json. Do not edit by hand.
+
+class ImpulseRule {
+  final String feature;
+  final String op;
+  final double weight;
+  final double? value;
+  final String? set;
+  final String? column;
+  final double factor;
+  final String? archetype;
+
+  const ImpulseRule({
+    required this.feature,
+    required this.op,
+    required this.weight,
+    this.value,
+    this.set,
+    this.column,
+    this.factor = 1.0,
+    this.archetype,
+  });
+}
+
+const double impulseThreshold = 5.0;
+const double impulseNoiseMean = 0.0;
+const double impulseNoiseStd = 0.5;
+
+const Map<String, Set<String>> impulseSets = {
+  'impulse_categories': {'Fashion', 'Gaming', 'Entertainment', 'Alcohol', 'Electronics'},
+};
+
+const List<ImpulseRule> impulseRules = [
+  ImpulseRule(feature: 'is_late_night', op: '==', weight: 2.0, value: 1.0), // late_night
+  ImpulseRule(feature: 'is_end_of_month', op: '==', weight: 1.5, value: 1.0), // end_of_month
+  ImpulseRule(feature: 'category', op: 'in', weight: 2.0, set: 'impulse_categories'), // impulse_category
+  ImpulseRule(feature: 'spending_velocity', op: '>=', weight: 1.5, value: 4.0), // high_velocity
+  ImpulseRule(feature: 'category_switch_count', op: '>=', weight: 1.0, value: 3.0), // category_switch
+  ImpulseRule(feature: 'amount', op: '>', weight: 2.0, column: 'avg_user_spend', factor: 2.5), // high_amount
+  ImpulseRule(feature: 'transaction_gap_minutes', op: '<', weight: 1.0, value: 15.0), // short_gap
+  ImpulseRule(feature: 'is_late_night', op: '==', weight: 1.0, value: 1.0, archetype: 'night_owl'), // night_owl_late
+  ImpulseRule(feature: 'is_end_of_month', op: '==', weight: 1.0, value: 1.0, archetype: 'eom_spender'), // eom_spender_eom
+  ImpulseRule(feature: 'spending_velocity', op: '>=', weight: 1.5, value: 5.0, archetype: 'freq_binger'), // binger_velocity
+];
+
+// Noise-free rule score; compare (score + noise) against impulseThreshold
+double impulseRuleScore(Map<String, Object> row, String archetype) {
+  double score = 0;
+  for (final r in impulseRules) {
+    if (r.archetype != null && r.archetype != archetype) continue;
+    final x = row[r.feature];
+    bool hit;
+    if (r.op == 'in') {
+      hit = impulseSets[r.set]!.contains(x);
+    } else {
+      final a = (x as num).toDouble();
+      final b = r.column != null
+          ? (row[r.column!] as num).toDouble() * r.factor
+          : r.value!;
+      switch (r.op) {
+        case '==':
+          hit = a == b;
+        case '!=':
+          hit = a != b;
+        case '>':
+          hit = a > b;
+        case '>=':
+          hit = a >= b;
+        case '<':
+          hit = a < b;
+        default:
+          hit = a <= b;
+      }
+    }
+    if (hit) score += r.weight;
+  }
+  return score;
+}
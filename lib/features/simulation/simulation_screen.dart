@@ -1,3 +1,5 @@
+// GENERATED by python/codegen.py from python/templates/lib/features/simulation/simulation_screen.dart.tmpl. Do not edit by hand.
+
 import 'package:flutter/material.dart';
 import 'package:animate_do/animate_do.dart';
 import '../../theme/app_theme.dart';
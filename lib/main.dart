@@ -9,8 +9,9 @@ import 'features/prediction/prediction_screen.dart';
 import 'features/nudges/nudges_screen.dart';
 import 'features/simulation/simulation_screen.dart';
 
-void main() {
+Future<void> main() async {
   WidgetsFlutterBinding.ensureInitialized();
+  await DataService.init();
   SystemChrome.setSystemUIOverlayStyle(
     const SystemUiOverlayStyle(
       statusBarColor: Colors.transparent,
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from features import ARTIFACTS, BASE, DATA_PATH, load_json
+
+# ─── CONFIG ───────────────────────────────────────────
+MODEL_PATH = os.path.join(ARTIFACTS, "archetype_model.json")
+OUTPUT_PATH = os.path.join(BASE, "data", "user_archetypes.csv")
+CHUNK_SIZE = 500_000
+# Chunk rollups merged into the running totals at once
+MERGE_EVERY = 8
+USER_BATCH = 50_000
+N_CLUSTERS = 4
+
+BEHAVIOUR = ["late_night_share", "eom_share", "velocity", "category_entropy", "spend_ratio"]
+
+# Direction of each archetype in standardized behaviour space; clusters are
+# matched to the archetype whose signature their centroid aligns with best.
+SIGNATURES = {
+    "night_owl":   [1.0, 0.0, 0.0, 0.0, 0.3],
+    "eom_spender": [0.0, 1.0, 0.0, 0.0, 0.3],
+    "freq_binger": [0.0, 0.0, 1.0, 0.5, 0.3],
+    "controlled":  [-1.0, -1.0, -1.0, -0.5, -1.0],
+}
+
+# ─── USER ROLLUPS ─────────────────────────────────────
+def rollup_chunk(df, category_map):
+    """Additive per-user sums for one chunk of transactions."""
+    codes = df["category"].map(category_map).fillna(len(category_map)).astype(int)
+    cats = pd.get_dummies(codes).reindex(columns=range(len(category_map) + 1), fill_value=0)
+    cats.columns = [f"cat_{c}" for c in cats.columns]
+    parts = pd.DataFrame({
+        "user_id": df["user_id"].to_numpy(),
+        "n": 1,
+        "late_night": df["is_late_night"].to_numpy(),
+        "eom": df["is_end_of_month"].to_numpy(),
+        "velocity": df["spending_velocity"].to_numpy(),
+        "spend_ratio": (df["amount"] / df["avg_user_spend"]).to_numpy(),
+    })
+    return pd.concat([parts, cats.reset_index(drop=True)], axis=1).groupby("user_id").sum()
+
+def build_rollups(path, category_map, chunk_size=CHUNK_SIZE, merge_every=MERGE_EVERY):
+    """Stream the transactions once and combine per-user sums across chunks.
+
+    Memory grows with the number of users, not transactions. The result
+    holds one row of sums per user (the behaviour columns plus one per
+    category), and a merge briefly holds it twice alongside up to
+    merge_every chunk rollups. Each merge touches every user seen so far,
+    so chunk rollups are merged in groups rather than one at a time.
+    """
+    totals, pending = None, []
+
+    def merge():
+        frames = ([totals] if totals is not None else []) + pending
+        return pd.concat(frames).groupby(level=0).sum()
+
+    for batch in pd.read_csv(path, chunksize=chunk_size):
+        pending.append(rollup_chunk(batch, category_map))
+        if len(pending) == merge_every:
+            totals, pending = merge(), []
+    return merge() if pending else totals
+
+def behaviour_vectors(rollups):
+    """Turn additive rollups into the per-user behaviour matrix."""
+    n = rollups["n"].to_numpy(dtype=np.float64)
+    cats = rollups.filter(like="cat_").to_numpy(dtype=np.float64)
+    p = cats / n[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.nansum(np.where(p > 0, p * np.log(p), 0.0), axis=1)
+    return np.column_stack([
+        rollups["late_night"] / n,
+        rollups["eom"] / n,
+        rollups["velocity"] / n,
+        entropy,
+        rollups["spend_ratio"] / n,
+    ])
+
+# ─── MODEL ────────────────────────────────────────────
+class ArchetypeModel:
+    """Mini-batch k-means over behaviour vectors, mapped onto the archetypes.
+
+    fit() runs MiniBatchKMeans; afterwards the model is just centroids plus
+    the number of users each has absorbed. update() moves every centroid
+    towards its new users with step 1/count, so a restored model keeps its
+    history and clusters are never reassigned to random points.
+    """
+
+    def __init__(self, n_clusters=N_CLUSTERS, mean=None, scale=None, centroids=None,
+                 counts=None, mapping=None):
+        self.n_clusters = n_clusters
+        self.mean = mean
+        self.scale = scale
+        self.centroids = None if centroids is None else np.asarray(centroids, dtype=np.float64)
+        self.counts = None if counts is None else np.asarray(counts, dtype=np.float64)
+        self.mapping = mapping
+
+    def _standardize(self, V):
+        return (V - self.mean) / self.scale
+
+    def _nearest(self, V, batch=USER_BATCH):
+        """Nearest centroid and distance per behaviour vector, batch users at a time.
+
+        Only one (batch, n_clusters, dims) difference array exists at once.
+        """
+        cluster = np.empty(len(V), dtype=np.int64)
+        dist = np.empty(len(V))
+        for start in range(0, len(V), batch):
+            Z = self._standardize(V[start:start + batch])
+            d = np.linalg.norm(Z[:, None, :] - self.centroids[None, :, :], axis=2)
+            cluster[start:start + batch] = d.argmin(axis=1)
+            dist[start:start + batch] = d.min(axis=1)
+        return cluster, dist
+
+    def fit(self, V, batch=USER_BATCH):
+        self.mean = V.mean(axis=0)
+        self.scale = np.where(V.std(axis=0) > 0, V.std(axis=0), 1.0)
+        kmeans = MiniBatchKMeans(n_clusters=self.n_clusters, batch_size=4096, n_init=3, random_state=42)
+        order = np.random.default_rng(42).permutation(len(V))
+        for start in range(0, len(V), batch):
+            kmeans.partial_fit(self._standardize(V[order[start:start + batch]]))
+        self.centroids = kmeans.cluster_centers_.copy()
+        self.counts = np.bincount(self._nearest(V, batch)[0],
+                                  minlength=self.n_clusters).astype(np.float64)
+        self.mapping = self.map_clusters()
+        return self
+
+    def update(self, V):
+        """Fold a batch of new users into the centroids."""
+        Z = self._standardize(V)
+        cluster = self._nearest(V)[0]
+        m = np.bincount(cluster, minlength=self.n_clusters).astype(np.float64)
+        sums = np.zeros_like(self.centroids)
+        np.add.at(sums, cluster, Z)
+        hit = m > 0
+        self.counts[hit] += m[hit]
+        self.centroids[hit] += (sums[hit] - m[hit, None] * self.centroids[hit]) / self.counts[hit, None]
+        self.mapping = self.map_clusters()
+
+    def map_clusters(self):
+        names = list(SIGNATURES)
+        affinity = self.centroids @ np.array([SIGNATURES[a] for a in names]).T
+        if affinity.shape[0] == len(names):
+            from scipy.optimize import linear_sum_assignment
+            rows, cols = linear_sum_assignment(-affinity)
+            return {int(r): names[c] for r, c in zip(rows, cols)}
+        return {i: names[j] for i, j in enumerate(affinity.argmax(axis=1))}
+
+    def assign(self, V):
+        """Return (archetype, cluster, distance) arrays for behaviour vectors."""
+        cluster, dist = self._nearest(V)
+        names = np.array([self.mapping[c] for c in range(len(self.mapping))])
+        return names[cluster], cluster, dist
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "behaviour": BEHAVIOUR,
+                "mean": self.mean.tolist(),
+                "scale": self.scale.tolist(),
+                "centroids": self.centroids.tolist(),
+                "counts": self.counts.tolist(),
+                "mapping": {str(k): v for k, v in self.mapping.items()},
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path) as f:
+            m = json.load(f)
+        return cls(n_clusters=len(m["centroids"]), mean=np.asarray(m["mean"]),
+                   scale=np.asarray(m["scale"]), centroids=m["centroids"], counts=m["counts"],
+                   mapping={int(k): v for k, v in m["mapping"].items()})
+
+# ─── MAIN ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Infer behaviour archetypes from transactions.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--out", default=OUTPUT_PATH)
+    parser.add_argument("--clusters", type=int, default=N_CLUSTERS)
+    parser.add_argument("--assign-only", action="store_true",
+                        help="assign with the saved model instead of refitting")
+    args = parser.parse_args()
+
+    category_map = load_json("category_map.json")
+    print("📂 Building user rollups...")
+    rollups = build_rollups(args.data, category_map)
+    V = behaviour_vectors(rollups)
+    # Only the user ids are needed from here on
+    users = rollups.index
+    del rollups
+    print(f"   {len(V)} users")
+
+    if args.assign_only:
+        model = ArchetypeModel.load()
+    else:
+        print(f"\n🧩 Clustering into {args.clusters} groups...")
+        model = ArchetypeModel(n_clusters=args.clusters).fit(V)
+        model.save()
+        print(f"   ✅ Model saved: {MODEL_PATH}")
+
+    archetype, cluster, dist = model.assign(V)
+    out = pd.DataFrame({
+        "user_id": users,
+        "inferred_archetype": archetype,
+        "cluster": cluster,
+        "distance": np.round(dist, 4),
+    })
+    out.to_csv(args.out, index=False)
+
+    print(f"\n🧠 Inferred archetype distribution:")
+    print(out["inferred_archetype"].value_counts())
+
+    # Synthetic data carries the generator's archetype, so report agreement
+    labels = pd.concat(
+        chunk.drop_duplicates("user_id")
+        for chunk in pd.read_csv(args.data, chunksize=CHUNK_SIZE,
+                                 usecols=lambda c: c in ("user_id", "archetype"))
+    )
+    if "archetype" in labels:
+        truth = labels.drop_duplicates("user_id").set_index("user_id")["archetype"]
+        agree = (out.set_index("user_id")["inferred_archetype"] == truth.reindex(users)).mean()
+        print(f"\n🎯 Agreement with generator archetypes: {agree:.1%}")
+    print(f"📁 Saved to: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+
+# ─── PATHS ────────────────────────────────────────────
+BASE = os.path.dirname(__file__)
+ROOT = os.path.normpath(os.path.join(BASE, ".."))
+TEMPLATES = os.path.join(BASE, "templates")
+SUFFIX = ".tmpl"
+
+# Each template renders to the same path relative to the repo root, e.g.
+# templates/lib/features/nudges/nudges_screen.dart.tmpl → lib/features/nudges/nudges_screen.dart.
+# Templates are plain Dart, so `$` interpolation needs no escaping.
+HEADER = ("// GENERATED by python/codegen.py from python/templates/{target}.tmpl. "
+          "Do not edit by hand.\n\n")
+
+# Targeted (target, old, new) edits, applied in memory in order after
+# rendering; a target without a template is patched from its on-disk copy.
+# A patch whose replacement is already present is a no-op. The old
+# fix_*.py corrections are folded into the templates and hand-written
+# screens, so none are pending.
+PATCHES = []
+
+# ─── RENDER ───────────────────────────────────────────
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def templates():
+    for dirpath, _, files in os.walk(TEMPLATES):
+        for name in sorted(files):
+            if name.endswith(SUFFIX):
+                src = os.path.join(dirpath, name)
+                yield os.path.relpath(src, TEMPLATES)[:-len(SUFFIX)].replace(os.sep, "/"), src
+
+def render():
+    """Return {repo-relative path: content} for every generated or patched file."""
+    out = {target: HEADER.format(target=target) + read(src) for target, src in templates()}
+    for target, old, new in PATCHES:
+        if target not in out:
+            out[target] = read(os.path.join(ROOT, target))
+        content = out[target]
+        if old in content:
+            out[target] = content.replace(old, new)
+        elif new not in content:
+            raise ValueError(f"patch for {target} no longer matches")
+    return out
+
+# ─── WRITE ────────────────────────────────────────────
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+def disk_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return digest(f.read())
+    except FileNotFoundError:
+        return None
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".codegen-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates 0600; keep the old mode, or give new files the
+        # mode open() would have under the current umask
+        if os.path.exists(path):
+            mode = os.stat(path).st_mode
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def sync(check=False):
+    """Write only files whose content hash differs from disk; return changed paths."""
+    changed = []
+    for target, content in sorted(render().items()):
+        data = content.encode("utf-8")
+        path = os.path.join(ROOT, target)
+        if disk_digest(path) == digest(data):
+            continue
+        changed.append(target)
+        if not check:
+            write_atomic(path, data)
+    return changed
+
+# ─── MAIN ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate Flutter screens from templates.")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any file is out of date; write nothing")
+    args = parser.parse_args()
+
+    changed = sync(check=args.check)
+    verb = "out of date" if args.check else "written"
+    for target in changed:
+        print(f"   ✏️  {target} {verb}")
+    print(f"✅ {len(changed)} file(s) {verb}, others unchanged")
+    if args.check and changed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import argparse
+import json
+import math
+import os
+import sys
+import numpy as np
+import pandas as pd
+from features import ARTIFACTS, DATA_PATH, FEATURES, engineer_features, load_isolation_forest, load_json
+
+# ─── CONFIG ───────────────────────────────────────────
+# Histogram edges live in standardized (z) space, so one grid serves every
+# feature: 32 bins over [-4, 4] plus an underflow and an overflow bucket.
+Z_EDGES = np.linspace(-4, 4, 33)
+N_BUCKETS = len(Z_EDGES) + 1
+
+CHUNK_SIZE = 100_000
+WINDOW_EVENTS = 1_000_000
+
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+KS_ALERT = 0.15
+UNKNOWN_CATEGORY_ALERT = 0.01
+EPS = 1e-6
+
+# Empirical training histograms, written by train_model.export_metadata
+BASELINE_PATH = os.path.join(ARTIFACTS, "drift_baseline.json")
+
+# ─── HELPERS ──────────────────────────────────────────
+def psi(actual, expected):
+    a = np.clip(actual, EPS, None)
+    e = np.clip(expected, EPS, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def binned_ks(actual, expected):
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+def standardize(X, mean, scale):
+    # A zero scale means a constant training column; keep z finite
+    return (X - mean) / np.where(scale > 0, scale, 1.0)
+
+def bucket_counts(Z, weights=None):
+    """Per-column bucket counts of the finite entries of Z, one row per column.
+
+    With per-row `weights` the counts are weighted sums instead.
+    """
+    valid = np.isfinite(Z)
+    # One bincount for all features: offset each column into its own row
+    buckets = np.searchsorted(Z_EDGES, np.where(valid, Z, 0.0)) + np.arange(Z.shape[1]) * N_BUCKETS
+    if weights is not None:
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64)[:, None], Z.shape)[valid]
+    flat = np.bincount(buckets[valid], weights=weights, minlength=Z.shape[1] * N_BUCKETS)
+    return flat.reshape(Z.shape[1], N_BUCKETS)
+
+def build_baseline(X, scaler, features, categories, n_categories, weights=None):
+    """Bucket probabilities of the training matrix X and its category codes.
+
+    Pass the sample weights of an importance-weighted training sample so the
+    baseline describes the population rather than the sample.
+    """
+    Z = standardize(X, np.asarray(scaler["mean"]), np.asarray(scaler["scale"]))
+    counts = bucket_counts(Z, weights)
+    cat_counts = np.bincount(categories.astype(np.int64), weights=weights, minlength=n_categories)
+    return {
+        "features": list(features),
+        "expected": (counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)).round(8).tolist(),
+        "categories": (cat_counts / max(cat_counts.sum(), 1)).round(8).tolist(),
+    }
+
+def save_baseline(baseline, path=BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump(baseline, f)
+
+def load_baseline(path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def iter_batches(path, chunk_size=CHUNK_SIZE):
+    yield from pd.read_csv(path, chunksize=chunk_size)
+
+# ─── MONITOR ──────────────────────────────────────────
+class DriftMonitor:
+    """Constant-memory drift sketches for a stream of transaction batches.
+
+    Every feature keeps a fixed bucket histogram and running moments in the
+    scaler's z-space; categories keep one counter per category_map entry
+    plus an "unknown" counter. Memory is independent of stream length.
+
+    The baseline is the training-time histogram from drift_baseline.json,
+    or one rebuilt with set_baseline(). Without one there is nothing to
+    compare against: features report moments and null rates only, and the
+    only alert is the unknown-category rate.
+    """
+
+    def __init__(self, scaler=None, category_map=None, baseline=None, iso=None,
+                 window_events=WINDOW_EVENTS):
+        scaler = scaler or load_json("scaler.json")
+        self.category_map = category_map or load_json("category_map.json")
+        self.features = list(scaler["features"])
+        self.mean = np.asarray(scaler["mean"], dtype=np.float64)
+        self.scale = np.asarray(scaler["scale"], dtype=np.float64)
+        self.window_events = window_events
+
+        # Raw transactions carry no anomaly_score; recompute it with the
+        # training Isolation Forest, or stop monitoring it if there is none
+        self.iso = iso
+        if self.iso is None and "anomaly_score" in self.features:
+            try:
+                self.iso = load_isolation_forest()
+            except FileNotFoundError:
+                print("⚠️  no isolation_forest.pkl; anomaly_score is not monitored", file=sys.stderr)
+                keep = [i for i, f in enumerate(self.features) if f != "anomaly_score"]
+                self.features = [self.features[i] for i in keep]
+                self.mean, self.scale = self.mean[keep], self.scale[keep]
+
+        n_feat = len(self.features)
+        baseline = baseline if baseline is not None else load_baseline()
+        self.has_baseline = np.zeros(n_feat, dtype=bool)
+        self.expected = np.zeros((n_feat, N_BUCKETS))
+        self.expected_categories = None
+        if baseline:
+            index = {f: i for i, f in enumerate(baseline["features"])}
+            for i, f in enumerate(self.features):
+                if f in index:
+                    self.has_baseline[i] = True
+                    self.expected[i] = baseline["expected"][index[f]]
+            if len(baseline["categories"]) == len(self.category_map):
+                self.expected_categories = np.asarray(baseline["categories"], dtype=np.float64)
+        self.window_id = 0
+        self._reset()
+
+    def _reset(self):
+        n_feat = len(self.features)
+        self.counts = np.zeros((n_feat, N_BUCKETS), dtype=np.int64)
+        self.nulls = np.zeros(n_feat, dtype=np.int64)
+        self.z_sum = np.zeros(n_feat)
+        self.z_sumsq = np.zeros(n_feat)
+        self.category_counts = np.zeros(len(self.category_map) + 1, dtype=np.int64)
+        self.events = 0
+
+    def _sketch(self, df):
+        df = engineer_features(df.copy(), self.category_map)
+        if self.iso is not None:
+            base = df[FEATURES].to_numpy(dtype=np.float64)
+            ok = np.isfinite(base).all(axis=1)
+            score = np.full(len(df), np.nan)
+            if ok.any():
+                score[ok] = self.iso.decision_function(base[ok])
+            df["anomaly_score"] = score
+        X = df.reindex(columns=self.features).to_numpy(dtype=np.float64)
+        Z = standardize(X, self.mean, self.scale)
+
+        valid = np.isfinite(Z)
+        self.nulls += (~valid).sum(axis=0)
+        Zv = np.where(valid, Z, 0.0)
+        self.z_sum += Zv.sum(axis=0)
+        self.z_sumsq += (Zv * Zv).sum(axis=0)
+        self.counts += bucket_counts(Z)
+
+        codes = df["category_encoded"].fillna(len(self.category_map)).to_numpy(dtype=np.int64)
+        self.category_counts += np.bincount(codes, minlength=self.category_counts.size)
+        self.events += len(df)
+
+    def set_baseline(self, path, chunk_size=CHUNK_SIZE):
+        """Replace the Gaussian baseline with empirical training histograms."""
+        for batch in iter_batches(path, chunk_size):
+            self._sketch(batch)
+        totals = self.counts.sum(axis=1, keepdims=True)
+        self.expected = np.where(totals > 0, self.counts / np.maximum(totals, 1), self.expected)
+        self.has_baseline = totals[:, 0] > 0
+        self.expected_categories = self.category_counts[:-1] / max(self.category_counts[:-1].sum(), 1)
+        self._reset()
+
+    def update(self, df):
+        """Consume one batch; returns a report each time a window closes."""
+        self._sketch(df)
+        if self.events >= self.window_events:
+            return self.flush()
+        return None
+
+    def flush(self):
+        if self.events == 0:
+            return None
+        report = self.report()
+        self.window_id += 1
+        self._reset()
+        return report
+
+    def report(self):
+        totals = self.counts.sum(axis=1)
+        features = {}
+        alerts = []
+        for i, name in enumerate(self.features):
+            n = int(totals[i])
+            if n == 0:
+                # Every value was null or non-finite
+                features[name] = {"psi": None, "ks": None, "mean_shift_z": None, "std_ratio": None,
+                                  "null_rate": round(int(self.nulls[i]) / self.events, 4)}
+                continue
+            actual = self.counts[i] / n
+            mean_z = self.z_sum[i] / n
+            std_z = math.sqrt(max(self.z_sumsq[i] / n - mean_z ** 2, 0.0))
+            features[name] = {
+                "psi": None,
+                "ks": None,
+                "mean_shift_z": round(mean_z, 4),
+                "std_ratio": round(std_z, 4),
+                "null_rate": round(int(self.nulls[i]) / self.events, 4),
+            }
+            if not self.has_baseline[i]:
+                continue
+            score = psi(actual, self.expected[i])
+            ks = binned_ks(actual, self.expected[i])
+            features[name].update(psi=round(score, 4), ks=round(ks, 4))
+            if score >= PSI_ALERT or ks >= KS_ALERT:
+                alerts.append({"feature": name, "level": "alert", "psi": round(score, 4), "ks": round(ks, 4)})
+            elif score >= PSI_WARN:
+                alerts.append({"feature": name, "level": "warn", "psi": round(score, 4), "ks": round(ks, 4)})
+
+        seen = self.category_counts.sum()
+        known = self.category_counts[:-1] / max(seen, 1)
+        unknown_rate = float(self.category_counts[-1] / max(seen, 1))
+        category_psi = None
+        if self.expected_categories is not None:
+            category_psi = round(psi(known, self.expected_categories), 4)
+        if (category_psi or 0) >= PSI_ALERT or unknown_rate >= UNKNOWN_CATEGORY_ALERT:
+            alerts.append({"feature": "category", "level": "alert",
+                           "psi": category_psi, "unknown_rate": round(unknown_rate, 4)})
+
+        return {
+            "window": self.window_id,
+            "events": int(self.events),
+            "features": features,
+            "category": {"psi": category_psi, "unknown_rate": round(unknown_rate, 4)},
+            "alerts": alerts,
+        }
+
+# ─── MAIN ─────────────────────────────────────────────
+def emit(report, out):
+    out.write(json.dumps(report) + "\n")
+    out.flush()
+    for a in report["alerts"]:
+        icon = "🚨" if a["level"] == "alert" else "⚠️ "
+        print(f"{icon} window {report['window']}: drift on {a['feature']} {a}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream transactions and report feature drift.")
+    parser.add_argument("source", nargs="?", default=DATA_PATH, help="transactions CSV ('-' for stdin)")
+    parser.add_argument("--baseline", help="training CSV to rebuild the baseline histograms from "
+                                           "(default: drift_baseline.json from the last training run)")
+    parser.add_argument("--window", type=int, default=WINDOW_EVENTS, help="events per report window")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--out", help="write JSON-lines metrics here instead of stdout")
+    args = parser.parse_args()
+
+    monitor = DriftMonitor(window_events=args.window)
+    if args.baseline:
+        print(f"📊 Building baseline from {args.baseline}...", file=sys.stderr)
+        monitor.set_baseline(args.baseline, args.chunk_size)
+    elif not monitor.has_baseline.any():
+        print(f"⚠️  no {BASELINE_PATH} and no --baseline: reporting moments and null rates only",
+              file=sys.stderr)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    try:
+        source = sys.stdin if args.source == "-" else args.source
+        for batch in iter_batches(source, args.chunk_size):
+            report = monitor.update(batch)
+            if report:
+                emit(report, out)
+        report = monitor.flush()
+        if report:
+            emit(report, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
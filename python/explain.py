@@ -0,0 +1,156 @@
+import argparse
+import os
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import xgboost as xgb_lib
+from features import DATA_PATH, BASE, FEATURES, MODEL_FEATURES, engineer_features, load_json, load_teacher
+
+# ─── CONFIG ───────────────────────────────────────────
+OUTPUT_PATH = os.path.join(BASE, "data", "explanations.csv")
+CHUNK_SIZE = 200_000
+TOP_K = 3
+# Raw feature values are rounded before caching so near-identical rows share
+# one explanation; 4 decimals is far below any split threshold that matters.
+CACHE_DECIMALS = 4
+CACHE_SIZE = 2_000_000
+
+# Reason code and app-facing label per model feature
+REASONS = {
+    "hour":                  ("HOUR",            "Time of day"),
+    "day_of_week":           ("WEEKDAY",         "Day of week"),
+    "day_of_month":          ("DAY_OF_MONTH",    "Day of month"),
+    "is_late_night":         ("LATE_NIGHT",      "Late night"),
+    "is_end_of_month":       ("END_OF_MONTH",    "End of month"),
+    "is_weekend":            ("WEEKEND",         "Weekend"),
+    "spending_velocity":     ("VELOCITY",        "Rapid purchases"),
+    "gap_normalized":        ("SHORT_GAP",       "Soon after last purchase"),
+    "category_switch_count": ("CATEGORY_SWITCH", "Category hopping"),
+    "mood_proxy_score":      ("MOOD",            "Mood signal"),
+    "spend_ratio":           ("HIGH_AMOUNT",     "Above your usual spend"),
+    "category_encoded":      ("CATEGORY",        "Impulse-prone category"),
+    "hour_bucket":           ("TIME_BUCKET",     "Time of day"),
+    "anomaly_score":         ("UNUSUAL",         "Unusual for you"),
+}
+REASON_CODES = np.array([REASONS[f][0] for f in MODEL_FEATURES])
+
+# ─── EXPLAINER ────────────────────────────────────────
+class Explainer:
+    """TreeSHAP reason codes from the XGBoost teacher, cached by base feature vector.
+
+    The anomaly score is a function of the base features, so the cache key
+    leaves it out and the Isolation Forest only runs on cache misses.
+    """
+
+    def __init__(self, top_k=TOP_K, nthread=-1, cache_size=CACHE_SIZE):
+        self.xgb, self.iso = load_teacher()
+        self.booster = self.xgb.get_booster()
+        self.booster.set_param({"nthread": nthread})
+        scaler = load_json("scaler.json")
+        self.mean = np.asarray(scaler["mean"])
+        self.scale = np.asarray(scaler["scale"])
+        self.category_map = load_json("category_map.json")
+        self.top_k = top_k
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def features(self, df):
+        """Base feature matrix; unknown categories and bad inputs come out NaN."""
+        df = engineer_features(df.copy(), self.category_map)
+        return df[FEATURES].to_numpy(dtype=np.float64)
+
+    def _shap(self, X):
+        """Per-feature log-odds contributions plus the expected value column."""
+        X = np.column_stack([X, self.iso.decision_function(X)])
+        Xs = (X - self.mean) / self.scale
+        return self.booster.predict(xgb_lib.DMatrix(Xs), pred_contribs=True)
+
+    def explain(self, X):
+        """Return (contributions, margin) for every row of finite base feature matrix X."""
+        X = np.round(X, CACHE_DECIMALS)
+        uniq, inverse = np.unique(X, axis=0, return_inverse=True)
+        keys = [row.tobytes() for row in uniq]
+
+        out = np.empty((len(uniq), len(MODEL_FEATURES) + 1))
+        missing = []
+        for i, key in enumerate(keys):
+            hit = self.cache.get(key)
+            if hit is None:
+                missing.append(i)
+            else:
+                self.cache.move_to_end(key)
+                out[i] = hit
+        self.hits += len(uniq) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            contribs = self._shap(uniq[missing])
+            out[missing] = contribs
+            for i, row in zip(missing, contribs):
+                self.cache[keys[i]] = row
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        out = out[inverse.reshape(-1)]
+        return out[:, :-1], out.sum(axis=1)
+
+    def reasons(self, contribs):
+        """Top-k features pushing towards impulse; empty where none push up."""
+        k = min(self.top_k, contribs.shape[1])
+        top = np.argsort(-contribs, axis=1)[:, :k]
+        vals = np.take_along_axis(contribs, top, axis=1)
+        codes = np.where(vals > 0, REASON_CODES[top], "")
+        return codes, vals
+
+    def explain_frame(self, df):
+        """One output row per input row, in input order.
+
+        Rows the models cannot score (unknown category, missing or invalid
+        values) get a NaN impulse_prob and no reasons instead of failing the
+        whole batch.
+        """
+        X = self.features(df)
+        ok = np.isfinite(X).all(axis=1)
+        contribs = np.zeros((len(X), len(MODEL_FEATURES)))
+        margin = np.full(len(X), np.nan)
+        if ok.any():
+            contribs[ok], margin[ok] = self.explain(X[ok])
+        self.skipped += int((~ok).sum())
+        codes, vals = self.reasons(contribs)
+        out = pd.DataFrame({
+            "user_id": df["user_id"].to_numpy(),
+            "timestamp": df["timestamp"].to_numpy(),
+            "impulse_prob": np.round(1 / (1 + np.exp(-margin)), 4),
+        })
+        for j in range(codes.shape[1]):
+            out[f"reason_{j + 1}"] = codes[:, j]
+            out[f"reason_{j + 1}_weight"] = np.round(vals[:, j], 4)
+        return out
+
+# ─── MAIN ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Backfill model-faithful reason codes for transactions.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--out", default=OUTPUT_PATH)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--threads", type=int, default=-1, help="TreeSHAP threads (-1 = all cores)")
+    args = parser.parse_args()
+
+    explainer = Explainer(top_k=args.top_k, nthread=args.threads)
+    total = 0
+    for i, batch in enumerate(pd.read_csv(args.data, chunksize=args.chunk_size)):
+        explainer.explain_frame(batch).to_csv(args.out, mode="w" if i == 0 else "a",
+                                              header=(i == 0), index=False)
+        total += len(batch)
+        print(f"   {total} transactions explained "
+              f"(cache hits {explainer.hits}, misses {explainer.misses})")
+
+    print(f"✅ Reasons written: {total} records ({explainer.skipped} unscorable)")
+    print(f"📁 Saved to: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import json
+import pandas as pd
+
+# ─── PATHS ────────────────────────────────────────────
+BASE = os.path.dirname(__file__)
+DATA_PATH = os.path.join(BASE, "data", "transactions.csv")
+MODEL_OUT = os.path.join(BASE, "..", "assets", "models")
+# Python-only training artifacts that should not ship inside the app bundle
+ARTIFACTS = os.path.join(BASE, "artifacts")
+
+# ─── FEATURE SPEC ─────────────────────────────────────
+FEATURES = [
+    "hour", "day_of_week", "day_of_month",
+    "is_late_night", "is_end_of_month", "is_weekend",
+    "spending_velocity", "gap_normalized",
+    "category_switch_count", "mood_proxy_score",
+    "spend_ratio", "category_encoded", "hour_bucket"
+]
+
+# Column order the scaler and the TFLite model expect
+MODEL_FEATURES = FEATURES + ["anomaly_score"]
+
+# Real-valued model inputs; every other feature is a flag, count or code
+CONTINUOUS_FEATURES = ["spend_ratio", "gap_normalized", "mood_proxy_score", "anomaly_score"]
+
+ARCHETYPE_MAP = {"controlled": 0, "night_owl": 1, "eom_spender": 2, "freq_binger": 3}
+
+# ─── HELPERS ──────────────────────────────────────────
+def load_json(name):
+    with open(os.path.join(MODEL_OUT, name)) as f:
+        return json.load(f)
+
+def load_isolation_forest():
+    import pickle
+    with open(os.path.join(ARTIFACTS, "isolation_forest.pkl"), "rb") as f:
+        return pickle.load(f)
+
+def load_teacher():
+    """Load the saved XGBoost teacher and Isolation Forest from ARTIFACTS."""
+    from xgboost import XGBClassifier
+    xgb = XGBClassifier()
+    xgb.load_model(os.path.join(ARTIFACTS, "xgb_teacher.json"))
+    return xgb, load_isolation_forest()
+
+def engineer_features(df, category_map):
+    """Add the derived model columns to a raw transactions frame, in place."""
+    df["category_encoded"] = df["category"].map(category_map)
+    if "archetype" in df:
+        df["archetype_encoded"] = df["archetype"].map(ARCHETYPE_MAP)
+
+    # Spend ratio vs user average
+    df["spend_ratio"] = df["amount"] / df["avg_user_spend"]
+
+    # Hour buckets: morning/afternoon/evening/night; NaN for a missing or
+    # out-of-range hour, so bad batches surface as nulls instead of raising
+    df["hour_bucket"] = pd.cut(df["hour"],
+        bins=[-1, 6, 12, 18, 23],
+        labels=[0, 1, 2, 3]).astype(float)
+
+    # Normalized gap (cap at 999)
+    df["gap_normalized"] = df["transaction_gap_minutes"].clip(upper=999) / 999
+    return df
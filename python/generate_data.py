@@ -3,6 +3,7 @@ import numpy as np
 import random
 from datetime import datetime, timedelta
 import os
+from label_rules import compile_row, load_rules
 
 np.random.seed(42)
 random.seed(42)
@@ -17,7 +18,8 @@ CATEGORIES = [
     "Electronics", "Grocery", "Travel", "Health", "Alcohol", "Subscriptions"
 ]
 
-IMPULSE_CATEGORIES = {"Fashion", "Gaming", "Entertainment", "Alcohol", "Electronics"}
+RULES = load_rules()
+IMPULSE_CATEGORIES = set(RULES["sets"]["impulse_categories"])
 
 ARCHETYPES = {
     "night_owl":      {"weight": 0.25, "late_night_prob": 0.6,  "eom_prob": 0.2, "velocity_mean": 4},
@@ -53,34 +55,8 @@ def generate_timestamp(archetype_cfg, base_date):
 
     return dt
 
-def compute_impulse_label(row, archetype):
-    score = 0
-
-    if row["is_late_night"]:
-        score += 2
-    if row["is_end_of_month"]:
-        score += 1.5
-    if row["category"] in IMPULSE_CATEGORIES:
-        score += 2
-    if row["spending_velocity"] >= 4:
-        score += 1.5
-    if row["category_switch_count"] >= 3:
-        score += 1
-    if row["amount"] > row["avg_user_spend"] * 2.5:
-        score += 2
-    if row["transaction_gap_minutes"] < 15:
-        score += 1
-    if archetype == "night_owl" and row["is_late_night"]:
-        score += 1
-    if archetype == "eom_spender" and row["is_end_of_month"]:
-        score += 1
-    if archetype == "freq_binger" and row["spending_velocity"] >= 5:
-        score += 1.5
-
-    # Add some noise
-    score += np.random.normal(0, 0.5)
-
-    return 1 if score >= 5 else 0
+# Label rules live in rules/impulse_rules.json, shared with the relabeller and the app
+compute_impulse_label = compile_row(RULES)
 
 # ─── MAIN GENERATOR ───────────────────────────────────
 def generate_dataset():
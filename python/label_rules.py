@@ -0,0 +1,228 @@
+import argparse
+import json
+import operator
+import os
+import numpy as np
+
+# ─── PATHS ────────────────────────────────────────────
+BASE = os.path.dirname(__file__)
+RULES_PATH = os.path.join(BASE, "rules", "impulse_rules.json")
+DART_OUT = os.path.join(BASE, "..", "lib", "core", "services", "impulse_rules.dart")
+
+CHUNK_SIZE = 1_000_000
+
+OPS = {
+    "==": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+}
+
+# ─── RULE TABLE ───────────────────────────────────────
+def load_rules(path=RULES_PATH):
+    with open(path) as f:
+        spec = json.load(f)
+    for rule in spec["rules"]:
+        if rule["op"] != "in" and rule["op"] not in OPS:
+            raise ValueError(f"rule {rule['name']}: unknown op {rule['op']!r}")
+        if rule["op"] == "in" and rule["set"] not in spec["sets"]:
+            raise ValueError(f"rule {rule['name']}: unknown set {rule['set']!r}")
+    return spec
+
+def columns_needed(spec):
+    cols = {"archetype"}
+    for rule in spec["rules"]:
+        cols.add(rule["feature"])
+        if "column" in rule:
+            cols.add(rule["column"])
+    return sorted(cols)
+
+def _condition(rule, spec):
+    """Return f(cols) -> value for one rule; works on scalars and arrays alike."""
+    feature = rule["feature"]
+    if rule["op"] == "in":
+        members = spec["sets"][rule["set"]]
+        member_set = set(members)
+        return lambda c: (np.isin(c[feature], members) if isinstance(c[feature], np.ndarray)
+                          else c[feature] in member_set)
+    op = OPS[rule["op"]]
+    if "column" in rule:
+        other, factor = rule["column"], rule.get("factor", 1.0)
+        return lambda c: op(c[feature], c[other] * factor)
+    value = rule["value"]
+    return lambda c: op(c[feature], value)
+
+# ─── COMPILERS ────────────────────────────────────────
+def compile_vectorized(spec):
+    """Compile the table into one pass of NumPy masks over whole columns.
+
+    Returns label(cols, rng) where cols maps column name -> 1-D array.
+    """
+    terms = [(_condition(r, spec), r["weight"], r.get("archetype")) for r in spec["rules"]]
+    threshold = spec["threshold"]
+    noise = spec["noise"]
+
+    def label(cols, rng):
+        cols = {k: np.asarray(v) for k, v in cols.items()}
+        n = len(next(iter(cols.values())))
+        score = np.zeros(n)
+        for cond, weight, archetype in terms:
+            mask = cond(cols)
+            if archetype is not None:
+                mask = mask & (cols["archetype"] == archetype)
+            score += weight * mask
+        score += rng.normal(noise["mean"], noise["std"], size=n)
+        return (score >= threshold).astype(np.int8)
+
+    return label
+
+def compile_row(spec):
+    """Per-row evaluator with the generator's original RNG call order."""
+    terms = [(_condition(r, spec), r["weight"], r.get("archetype")) for r in spec["rules"]]
+    threshold = spec["threshold"]
+    noise = spec["noise"]
+
+    def label(row, archetype):
+        score = 0
+        for cond, weight, only in terms:
+            if (only is None or only == archetype) and cond(row):
+                score += weight
+        score += np.random.normal(noise["mean"], noise["std"])
+        return 1 if score >= threshold else 0
+
+    return label
+
+# ─── DART EXPORT ──────────────────────────────────────
+def _dart_str(s):
+    return "'" + s.replace("\\", "\\\\").replace("'", "\\'").replace("$", "\\$") + "'"
+
+def _dart_num(x):
+    return f"{float(x)!r}"
+
+def emit_dart(spec, rules_path=RULES_PATH):
+    """Render the rule table as a const Dart table plus its evaluator."""
+    lines = []
+    for r in spec["rules"]:
+        args = [f"feature: {_dart_str(r['feature'])}", f"op: {_dart_str(r['op'])}",
+                f"weight: {_dart_num(r['weight'])}"]
+        if "value" in r:
+            args.append(f"value: {_dart_num(r['value'])}")
+        if "set" in r:
+            args.append(f"set: {_dart_str(r['set'])}")
+        if "column" in r:
+            args.append(f"column: {_dart_str(r['column'])}")
+            args.append(f"factor: {_dart_num(r.get('factor', 1.0))}")
+        if "archetype" in r:
+            args.append(f"archetype: {_dart_str(r['archetype'])}")
+        lines.append(f"  ImpulseRule({', '.join(args)}), // {r['name']}")
+
+    sets = "\n".join(
+        f"  {_dart_str(name)}: {{{', '.join(_dart_str(m) for m in members)}}},"
+        for name, members in spec["sets"].items()
+    )
+    source = os.path.relpath(rules_path, os.path.join(BASE, "..")).replace(os.sep, "/")
+    return f"""// GENERATED by python/label_rules.py from {source}. Do not edit by hand.
+
+class ImpulseRule {{
+  final String feature;
+  final String op;
+  final double weight;
+  final double? value;
+  final String? set;
+  final String? column;
+  final double factor;
+  final String? archetype;
+
+  const ImpulseRule({{
+    required this.feature,
+    required this.op,
+    required this.weight,
+    this.value,
+    this.set,
+    this.column,
+    this.factor = 1.0,
+    this.archetype,
+  }});
+}}
+
+const double impulseThreshold = {_dart_num(spec['threshold'])};
+const double impulseNoiseMean = {_dart_num(spec['noise']['mean'])};
+const double impulseNoiseStd = {_dart_num(spec['noise']['std'])};
+
+const Map<String, Set<String>> impulseSets = {{
+{sets}
+}};
+
+const List<ImpulseRule> impulseRules = [
+{chr(10).join(lines)}
+];
+
+// Noise-free rule score; compare (score + noise) against impulseThreshold
+double impulseRuleScore(Map<String, Object> row, String archetype) {{
+  double score = 0;
+  for (final r in impulseRules) {{
+    if (r.archetype != null && r.archetype != archetype) continue;
+    final x = row[r.feature];
+    bool hit;
+    if (r.op == 'in') {{
+      hit = impulseSets[r.set]!.contains(x);
+    }} else {{
+      final a = (x as num).toDouble();
+      final b = r.column != null
+          ? (row[r.column!] as num).toDouble() * r.factor
+          : r.value!;
+      switch (r.op) {{
+        case '==':
+          hit = a == b;
+        case '!=':
+          hit = a != b;
+        case '>':
+          hit = a > b;
+        case '>=':
+          hit = a >= b;
+        case '<':
+          hit = a < b;
+        default:
+          hit = a <= b;
+      }}
+    }}
+    if (hit) score += r.weight;
+  }}
+  return score;
+}}
+"""
+
+# ─── MAIN ─────────────────────────────────────────────
+def relabel(src, dst, spec, seed=42, chunk_size=CHUNK_SIZE):
+    import pandas as pd
+    label = compile_vectorized(spec)
+    rng = np.random.default_rng(seed)
+    needed = columns_needed(spec)
+    total = positives = 0
+    for i, batch in enumerate(pd.read_csv(src, chunksize=chunk_size)):
+        batch["impulse_label"] = label({c: batch[c].to_numpy() for c in needed}, rng)
+        batch.to_csv(dst, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        total += len(batch)
+        positives += int(batch["impulse_label"].sum())
+    return total, positives
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile impulse label rules to NumPy and Dart.")
+    parser.add_argument("--rules", default=RULES_PATH)
+    parser.add_argument("--relabel", nargs=2, metavar=("SRC", "DST"),
+                        help="rewrite impulse_label of SRC under the rule table into DST")
+    parser.add_argument("--seed", type=int, default=42, help="noise seed for --relabel")
+    parser.add_argument("--emit-dart", action="store_true", help=f"regenerate {os.path.relpath(DART_OUT, BASE)}")
+    args = parser.parse_args()
+
+    spec = load_rules(args.rules)
+    if args.relabel:
+        total, positives = relabel(*args.relabel, spec, seed=args.seed)
+        print(f"✅ Relabelled {total} records ({positives / max(total, 1):.1%} impulse)")
+        print(f"📁 Saved to: {args.relabel[1]}")
+    if args.emit_dart:
+        with open(DART_OUT, "w", encoding="utf-8") as f:
+            f.write(emit_dart(spec, args.rules))
+        print(f"✅ Dart rule table written: {DART_OUT}")
+
+if __name__ == "__main__":
+    main()
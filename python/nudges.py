@@ -0,0 +1,133 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from features import BASE, DATA_PATH, load_json
+
+# ─── CONFIG ───────────────────────────────────────────
+OUTPUT_PATH = os.path.join(BASE, "data", "nudges.jsonl")
+TOP_N = 3
+COLUMNS = ["user_id", "timestamp", "category", "amount", "avg_user_spend",
+           "is_late_night", "is_end_of_month", "spending_velocity", "impulse_label"]
+
+# ─── ROLLUPS ──────────────────────────────────────────
+def _max_run(df, flag):
+    """Longest run of consecutive True `flag` rows per user (df sorted by user, time)."""
+    user = df["user_id"]
+    breaks = (flag != flag.shift()) | (user != user.shift())
+    run_id = breaks.cumsum()
+    lengths = flag.groupby(run_id).transform("size").where(flag, 0)
+    return lengths.groupby(user).max()
+
+def user_rollups(df, score_col):
+    df = df.sort_values(["user_id", "timestamp"], kind="stable").reset_index(drop=True)
+    score = df[score_col]
+    impulse = score >= 0.5
+    g = df.groupby("user_id")
+
+    eom = df["is_end_of_month"] == 1
+    r = pd.DataFrame({
+        "n": g.size(),
+        "avg_spend": g["avg_user_spend"].first(),
+        "total_spend": g["amount"].sum(),
+        "impulse_spend": df["amount"].where(impulse, 0).groupby(df["user_id"]).sum(),
+        "mean_score": score.groupby(df["user_id"]).mean(),
+        "big_tickets": (df["amount"] > df["avg_user_spend"] * 2.5).groupby(df["user_id"]).sum(),
+        "eom_mean": df["amount"].where(eom).groupby(df["user_id"]).mean(),
+        "rest_mean": df["amount"].where(~eom).groupby(df["user_id"]).mean(),
+        "max_velocity": g["spending_velocity"].max(),
+        "late_impulse_streak": _max_run(df, (df["is_late_night"] == 1) & impulse),
+        "controlled_streak": _max_run(df, ~impulse),
+    })
+
+    # Category of each user's fastest burst
+    burst = df.loc[df.groupby("user_id")["spending_velocity"].idxmax(), ["user_id", "category"]]
+    r["burst_category"] = burst.set_index("user_id")["category"]
+    return r
+
+# ─── TRIGGERS ─────────────────────────────────────────
+def candidates(r):
+    """Each trigger is a vectorized (fires, priority, value) over all users."""
+    eom_ratio = (r["eom_mean"] / r["rest_mean"]).fillna(0)
+    share = (r["impulse_spend"] / r["total_spend"]).fillna(0)
+    return {
+        "late_night_streak": (r["late_impulse_streak"] >= 2,
+                              np.clip(r["late_impulse_streak"] / 5, 0, 1) + 0.3,
+                              r["late_impulse_streak"].astype(int)),
+        "eom_spike":         (eom_ratio >= 1.5,
+                              np.clip((eom_ratio - 1) / 2, 0, 1) + 0.2,
+                              eom_ratio.round(1)),
+        "velocity_burst":    (r["max_velocity"] >= 4,
+                              np.clip(r["max_velocity"] / 8, 0, 1) + 0.2,
+                              r["burst_category"]),
+        "big_ticket":        (r["big_tickets"] >= 2,
+                              np.clip(r["big_tickets"] / r["n"] * 4, 0, 1),
+                              (r["avg_spend"] * 1.5).round(-1).astype(int)),
+        "impulse_share":     (share >= 0.3,
+                              share,
+                              (share * 100).round().astype(int)),
+        "controlled_streak": ((r["controlled_streak"] >= 5) & (r["mean_score"] < 0.4),
+                              pd.Series(0.1, index=r.index),
+                              r["controlled_streak"].astype(int)),
+    }
+
+def rank_nudges(r, top_n=TOP_N):
+    """Long frame of the top_n firing nudges per user, best first."""
+    frames = []
+    for nudge_id, (fires, priority, value) in candidates(r).items():
+        frames.append(pd.DataFrame({
+            "user_id": r.index[fires.to_numpy()],
+            "nudge": nudge_id,
+            "priority": priority[fires].round(3).to_numpy(),
+            "value": value[fires].to_numpy(),
+        }))
+    long = pd.concat(frames, ignore_index=True)
+    long = long.sort_values(["user_id", "priority"], ascending=[True, False], kind="stable")
+    long = long[long.groupby("user_id").cumcount() < top_n]
+    return long.reset_index(drop=True)
+
+# ─── MAIN ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Generate personalized nudges for every user.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--scores", help="explain.py output for --data: one row per transaction, "
+                                         "in the same order, with user_id, timestamp, impulse_prob")
+    parser.add_argument("--out", default=OUTPUT_PATH)
+    parser.add_argument("--top-n", type=int, default=TOP_N)
+    args = parser.parse_args()
+
+    print("📂 Loading transactions...")
+    df = pd.read_csv(args.data, usecols=COLUMNS, dtype={"category": "category"})
+    score_col = "impulse_label"
+    if args.scores:
+        # Joined by row position: (user_id, timestamp) is not unique, since
+        # a user can buy twice in the same minute
+        scores = pd.read_csv(args.scores, usecols=["user_id", "timestamp", "impulse_prob"])
+        if len(scores) != len(df) or not (
+                (scores["user_id"].to_numpy() == df["user_id"].to_numpy()).all()
+                and (scores["timestamp"].to_numpy() == df["timestamp"].to_numpy()).all()):
+            raise ValueError(f"{args.scores} does not line up row by row with {args.data}")
+        # Rows explain.py could not score keep their label
+        df["impulse_prob"] = scores["impulse_prob"].fillna(df["impulse_label"])
+        score_col = "impulse_prob"
+    print(f"   {len(df)} records, scoring by {score_col}")
+
+    print("\n🧮 Building user rollups...")
+    r = user_rollups(df, score_col)
+    nudges = rank_nudges(r, args.top_n)
+
+    # Every trigger needs copy in the catalog that renders it
+    uncatalogued = set(nudges["nudge"]) - set(load_json("nudge_catalog.json"))
+    if uncatalogued:
+        raise ValueError(f"nudges missing from nudge_catalog.json: {', '.join(sorted(uncatalogued))}")
+
+    # One JSON object per user-nudge: the trigger id plus the value for its
+    # catalog template's {value}; no text is rendered here
+    nudges.to_json(args.out, orient="records", lines=True)
+
+    print(f"\n💡 {len(nudges)} nudges for {nudges['user_id'].nunique()} of {len(r)} users")
+    print(nudges["nudge"].value_counts())
+    print(f"📁 Saved to: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import inspect
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from features import ARTIFACTS, BASE, DATA_PATH, MODEL_OUT
+
+# ─── STAGE GRAPH ──────────────────────────────────────
+class Stage:
+    """One pipeline step.
+
+    Thread stages get the shared ctx dict and their CPU grant; process
+    stages get no arguments and must exchange data through files only. A
+    stage with no outputs is intermediate: it only runs when a stage that
+    depends on it runs.
+    """
+
+    def __init__(self, name, fn, deps=(), inputs=(), outputs=(), cpus=1, pool="thread"):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cpus = cpus
+        self.pool = pool
+
+def topo_order(stages):
+    order, seen = [], set()
+
+    def visit(name, path=()):
+        if name in path:
+            raise ValueError(f"cycle in pipeline: {' → '.join(path + (name,))}")
+        if name in seen:
+            return
+        for dep in stages[name].deps:
+            visit(dep, path + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+def is_stale(stage):
+    if not stage.outputs:
+        return False
+    if not all(os.path.exists(p) for p in stage.outputs):
+        return True
+    oldest_out = min(os.path.getmtime(p) for p in stage.outputs)
+    newest_in = max((os.path.getmtime(p) for p in stage.inputs if os.path.exists(p)), default=0)
+    return newest_in > oldest_out
+
+def plan(stages, order, force=False):
+    """Stages to run: stale ones, everything downstream, and ctx producers they need."""
+    dirty = {n for n in order if force or is_stale(stages[n])}
+    for n in order:
+        if any(d in dirty for d in stages[n].deps):
+            dirty.add(n)
+    for n in reversed(order):
+        if n in dirty and stages[n].pool == "thread":
+            dirty.update(d for d in stages[n].deps if stages[d].pool == "thread")
+    return [n for n in order if n in dirty]
+
+def critical_path(stages, order, timings):
+    """Longest chain of dependent stages by measured duration."""
+    finish, prev = {}, {}
+    for n in order:
+        best = max(stages[n].deps, key=lambda d: finish[d], default=None)
+        finish[n] = (finish[best] if best else 0.0) + timings.get(n, 0.0)
+        prev[n] = best
+    end = max(order, key=lambda n: finish[n])
+    path = [end]
+    while prev[path[-1]]:
+        path.append(prev[path[-1]])
+    return path[::-1], finish[end]
+
+# ─── RUNNER ───────────────────────────────────────────
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def run_pipeline(stages, cpu_budget=None, force=False, dry_run=False):
+    stages = {s.name: s for s in stages}
+    order = topo_order(stages)
+    todo = plan(stages, order, force)
+    skipped = [n for n in order if n not in todo]
+    budget = cpu_budget or os.cpu_count() or 1
+
+    for n in skipped:
+        print(f"⏭️  {n}: up to date")
+    if dry_run:
+        for n in todo:
+            print(f"▶️  {n}: would run")
+        return {}
+
+    ctx = {}
+    timings = {}
+    done = set(skipped)
+    pending = list(todo)
+    running = {}
+    free = budget
+    wall_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(len(todo), 1)) as threads, \
+         ProcessPoolExecutor(max_workers=budget) as procs:
+        while pending or running:
+            for n in list(pending):
+                s = stages[n]
+                if not all(d in done for d in s.deps):
+                    continue
+                # A stage wider than the whole budget still runs, but alone
+                cpus = min(s.cpus, budget)
+                if cpus > free:
+                    continue
+                free -= cpus
+                pending.remove(n)
+                print(f"▶️  {n} started ({cpus} cpu)")
+                if s.pool == "process":
+                    fut = procs.submit(_timed, s.fn)
+                else:
+                    fut = threads.submit(_timed, s.fn, ctx, cpus)
+                running[fut] = (n, cpus)
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                n, cpus = running.pop(fut)
+                free += cpus
+                timings[n] = fut.result()
+                done.add(n)
+                print(f"✅ {n} finished in {timings[n]:.1f}s")
+
+    wall = time.perf_counter() - wall_start
+    path, length = critical_path(stages, order, timings)
+    print(f"\n⏱️  Wall time {wall:.1f}s vs {sum(timings.values()):.1f}s serial")
+    print(f"🧵 Critical path ({length:.1f}s): {' → '.join(path)}")
+    return timings
+
+# ─── IMPULSEIQ PIPELINE ───────────────────────────────
+def _generate():
+    import generate_data
+    generate_data.generate_dataset()
+
+def _validate():
+    import validate
+    report = validate.run(DATA_PATH)
+    if report["reject_rate"] > validate.MAX_REJECT_RATE:
+        raise RuntimeError(f"validation rejected {report['reject_rate']:.2%} of rows; "
+                           f"see {validate.QUARANTINE_PATH}")
+    print(f"   🔎 {report['quarantined']} of {report['rows']} rows quarantined")
+
+def _prepare(ctx, cpus):
+    import train_model
+    import validate
+    # Read from disk so a prepare run does not need validate to rerun
+    ctx["rejected_path"] = validate.REJECTED_PATH
+    train_model.prepare(ctx)
+
+def _trainer(name):
+    def run(ctx, cpus):
+        import train_model
+        fn = getattr(train_model, name)
+        if "cpus" in inspect.signature(fn).parameters:
+            fn(ctx, cpus=cpus)
+        else:
+            fn(ctx)
+    return run
+
+def build_stages():
+    py = lambda *names: [os.path.join(BASE, n) for n in names]
+    models = lambda *names: [os.path.join(MODEL_OUT, n) for n in names]
+    rejected_path = os.path.join(BASE, "data", "transactions.rejected.npy")
+    train_inputs = [DATA_PATH, rejected_path] + py("train_model.py", "features.py")
+    return [
+        Stage("generate", _generate, pool="process",
+              inputs=py("generate_data.py", "label_rules.py", "rules/impulse_rules.json"),
+              outputs=[DATA_PATH]),
+        # category_map.json is deliberately not an input: export_metadata
+        # rewrites it every run, and unknown categories only warn. A process
+        # stage, so plan() never reruns it just because prepare runs: its
+        # rejected rows are a training input, and rewriting them would make
+        # the next run retrain.
+        Stage("validate", _validate, deps=["generate"], pool="process",
+              inputs=[DATA_PATH] + py("validate.py"),
+              outputs=[rejected_path, os.path.join(BASE, "data", "validation_report.json")]),
+        Stage("prepare", _prepare, deps=["validate"]),
+        Stage("fit_teacher", _trainer("fit_teacher"), deps=["prepare"], cpus=4, inputs=train_inputs,
+              outputs=[os.path.join(ARTIFACTS, "xgb_teacher.json"), os.path.join(ARTIFACTS, "isolation_forest.pkl")]),
+        Stage("evaluate", _trainer("evaluate"), deps=["fit_teacher"], inputs=train_inputs,
+              outputs=[os.path.join(ARTIFACTS, "metrics.json")]),
+        Stage("export_lut", _trainer("export_lut"), deps=["fit_teacher"], cpus=2,
+              inputs=train_inputs + py("score_lut.py"), outputs=[os.path.join(ARTIFACTS, "score_lut_report.json")]),
+        Stage("distill", _trainer("distill"), deps=["fit_teacher"], cpus=2),
+        Stage("convert_tflite", _trainer("convert_tflite"), deps=["distill"], inputs=train_inputs,
+              outputs=models("impulse_model.tflite")),
+        Stage("export_metadata", _trainer("export_metadata"), deps=["fit_teacher"], inputs=train_inputs,
+              outputs=models("scaler.json", "category_map.json", "archetype_map.json", "feature_importance.json")
+              + [os.path.join(ARTIFACTS, "drift_baseline.json")]),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Run generate → train → export as a concurrent DAG.")
+    parser.add_argument("--cpus", type=int, help="CPU budget shared by concurrent stages")
+    parser.add_argument("--force", action="store_true", help="rerun every stage")
+    parser.add_argument("--dry-run", action="store_true", help="show which stages would run")
+    args = parser.parse_args()
+    run_pipeline(build_stages(), cpu_budget=args.cpus, force=args.force, dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
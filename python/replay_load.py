@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import importlib
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import pandas as pd
+from features import DATA_PATH
+
+# ─── CONFIG ───────────────────────────────────────────
+DEFAULT_SPEEDUP = 3600.0   # one hour of history per wall-clock second
+DEFAULT_USERS = 200
+PERCENTILES = [50, 90, 99, 99.9, 100]
+
+# Log-linear histogram: ~1% relative precision from 1µs to ~10 min
+HIST_GROWTH = 1.01
+HIST_BUCKETS = int(math.log(600e6) / math.log(HIST_GROWTH)) + 2
+
+# ─── LATENCY HISTOGRAM ────────────────────────────────
+class LatencyHistogram:
+    """Fixed-size log-bucketed histogram of latencies in microseconds."""
+
+    def __init__(self):
+        self.counts = [0] * HIST_BUCKETS
+        self.total = 0
+        self.max_us = 0.0
+
+    def record(self, seconds):
+        us = max(seconds * 1e6, 1.0)
+        idx = min(int(math.log(us) / math.log(HIST_GROWTH)), HIST_BUCKETS - 1)
+        self.counts[idx] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, us)
+
+    def percentile(self, p):
+        if self.total == 0:
+            return 0.0
+        if p >= 100:
+            return self.max_us / 1000
+        target = math.ceil(self.total * p / 100)
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                # A bucket's upper bound can lie above anything recorded
+                return min(HIST_GROWTH ** (idx + 1), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self):
+        return {f"p{p}": round(self.percentile(p), 3) for p in PERCENTILES}
+
+# ─── TARGETS ──────────────────────────────────────────
+def load_callable(spec):
+    """Resolve 'module:function' to an in-process scoring function."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name or "score")
+
+class HttpTarget:
+    """Minimal HTTP/1.x JSON client, one connection per simulated user.
+
+    Connections are kept alive when the server allows it and reopened after
+    `Connection: close`, HTTP/1.0 or a close-delimited body. Bodies may be
+    Content-Length, chunked or read to EOF.
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+        self.reader = None
+        self.writer = None
+
+    async def __call__(self, payload):
+        body = json.dumps(payload).encode()
+        request = (
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        # A kept-alive connection may have been closed by the server while
+        # idle; that shows up as EOF before the status line, so retry once
+        reused = self.writer is not None
+        try:
+            status = await self._exchange(request)
+        except ConnectionError:
+            self.close()
+            if not reused:
+                raise
+            status = await self._exchange(request)
+        except Exception:
+            self.close()
+            raise
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status}")
+
+    async def _exchange(self, request):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(request)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before response")
+        version, status = status_line.split()[:2]
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+
+        connection = headers.get("connection", "")
+        keep_alive = connection != "close" if version == b"HTTP/1.1" else connection == "keep-alive"
+        if "chunked" in headers.get("transfer-encoding", ""):
+            await self._read_chunked()
+        elif "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            await self.reader.read()
+            keep_alive = False
+        if not keep_alive:
+            self.close()
+        return int(status)
+
+    async def _read_chunked(self):
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                break
+            await self.reader.readexactly(size + 2)
+        # Skip trailers up to the terminating blank line
+        while (await self.reader.readline()) not in (b"\r\n", b""):
+            pass
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+# ─── SCHEDULE ─────────────────────────────────────────
+def load_schedule(path, speedup=None, rate=None):
+    """Return transactions in timestamp order with an intended send offset (s)."""
+    df = pd.read_csv(path)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+    if rate:
+        df["send_at"] = df.index / rate
+    else:
+        elapsed = (df["timestamp"] - df["timestamp"].iloc[0]).dt.total_seconds()
+        df["send_at"] = elapsed / speedup
+    df["timestamp"] = df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return df
+
+# ─── RUNNER ───────────────────────────────────────────
+class Stats:
+    def __init__(self):
+        self.service = LatencyHistogram()    # measured from actual send
+        self.corrected = LatencyHistogram()  # measured from intended send
+        self.ok = 0
+        self.errors = {}
+
+async def user_worker(rows, make_target, start, stats, executor):
+    target = make_target()
+    is_async = asyncio.iscoroutinefunction(target) or isinstance(target, HttpTarget)
+    loop = asyncio.get_running_loop()
+    try:
+        for send_at, payload in rows:
+            intended = start + send_at
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent = loop.time()
+            try:
+                if is_async:
+                    await target(payload)
+                else:
+                    # Sync scorers run on the pool so they don't block the
+                    # event loop, the other users or the pacing timers
+                    await loop.run_in_executor(executor, target, payload)
+                stats.ok += 1
+            except Exception as e:
+                key = type(e).__name__ if not isinstance(e, RuntimeError) else str(e)
+                stats.errors[key] = stats.errors.get(key, 0) + 1
+            done = loop.time()
+            stats.service.record(done - sent)
+            # Coordinated-omission correction: a request that could not be sent
+            # on time because the previous one was slow still owes that wait.
+            stats.corrected.record(done - intended)
+    finally:
+        if isinstance(target, HttpTarget):
+            target.close()
+
+async def replay(schedule, make_target, users, workers=None):
+    records = schedule.drop(columns=["send_at"]).to_dict("records")
+    lanes = [[] for _ in range(users)]
+    # Pin each user to one lane so their own transactions stay ordered
+    lane_of = schedule["user_id"].astype("category").cat.codes.to_numpy() % users
+    for lane, send_at, payload in zip(lane_of, schedule["send_at"], records):
+        lanes[lane].append((send_at, payload))
+
+    stats = Stats()
+    loop = asyncio.get_running_loop()
+    start = loop.time() + 0.1
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers or users) as executor:
+        await asyncio.gather(*(user_worker(l, make_target, start, stats, executor) for l in lanes if l))
+    wall = time.perf_counter() - wall_start
+    return stats, wall
+
+def report(stats, wall, schedule):
+    total = stats.ok + sum(stats.errors.values())
+    offered = len(schedule) / max(schedule["send_at"].iloc[-1], 1e-9)
+    return {
+        "requests": total,
+        "ok": stats.ok,
+        "errors": stats.errors,
+        "wall_seconds": round(wall, 3),
+        "offered_rps": round(offered, 1),
+        "achieved_rps": round(total / wall, 1) if wall else 0.0,
+        "service_ms": stats.service.summary(),
+        "corrected_ms": stats.corrected.summary(),
+    }
+
+# ─── MAIN ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Replay transactions against a scorer and measure latency.")
+    parser.add_argument("target", help="http://host:port/path or module:function")
+    parser.add_argument("--data", default=DATA_PATH, help="transactions CSV to replay")
+    parser.add_argument("--speedup", type=float, default=DEFAULT_SPEEDUP, help="history seconds per wall second")
+    parser.add_argument("--rate", type=float, help="fixed requests/second instead of timestamp pacing")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help="concurrent simulated users")
+    parser.add_argument("--workers", type=int,
+                        help="threads for a synchronous module:function scorer (default: --users)")
+    parser.add_argument("--limit", type=int, help="replay only the first N transactions")
+    parser.add_argument("--sweep-slo-ms", type=float,
+                        help="with --rate: double the rate until corrected p99 exceeds this SLO")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    if args.target.startswith("http://"):
+        make_target = lambda: HttpTarget(args.target)
+    else:
+        fn = load_callable(args.target)
+        make_target = lambda: fn
+
+    rate = args.rate
+    results = []
+    while True:
+        schedule = load_schedule(args.data, speedup=args.speedup, rate=rate)
+        if args.limit:
+            schedule = schedule.head(args.limit)
+
+        print(f"🚀 Replaying {len(schedule)} transactions with {args.users} users → {args.target}")
+        stats, wall = asyncio.run(replay(schedule, make_target, args.users, args.workers))
+        result = report(stats, wall, schedule)
+        results.append(result)
+
+        print(f"\n📊 {result['requests']} requests in {result['wall_seconds']}s "
+              f"(offered {result['offered_rps']}/s, achieved {result['achieved_rps']}/s)")
+        print(f"   errors: {result['errors'] or 'none'}")
+        print(f"   service latency ms:   {result['service_ms']}")
+        print(f"   corrected latency ms: {result['corrected_ms']}")
+
+        if not (rate and args.sweep_slo_ms):
+            break
+        if result["corrected_ms"]["p99"] > args.sweep_slo_ms or result["errors"]:
+            print(f"\n🧱 Saturated at ~{rate:.0f} req/s (last passing: "
+                  f"{rate / 2:.0f} req/s)" if len(results) > 1 else f"\n🧱 Saturated at the first rate")
+            break
+        rate *= 2
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results if len(results) > 1 else results[0], f, indent=2)
+        print(f"📁 Saved to: {args.out}")
+
+if __name__ == "__main__":
+    main()
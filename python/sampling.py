@@ -0,0 +1,89 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from features import BASE, DATA_PATH
+
+# ─── CONFIG ───────────────────────────────────────────
+OUTPUT_PATH = os.path.join(BASE, "data", "train_sample.csv")
+CHUNK_SIZE = 1_000_000
+PER_STRATUM = 20_000
+NEGATIVE_RATE = 1.0
+STRATA = ["impulse_label", "archetype", "month"]
+
+# ─── SAMPLER ──────────────────────────────────────────
+class StratifiedReservoir:
+    """Single-pass stratified sample with inverse-probability weights.
+
+    Each row gets a uniform random key and every stratum keeps the
+    `capacity` rows with the smallest keys (bottom-k sampling). That is a
+    uniform sample without replacement, and unlike the sequential
+    Algorithm R it merges chunk by chunk with one vectorized sort. Negatives
+    can be thinned by a Bernoulli `negative_rate` before they reach the
+    reservoir; weights = rows seen / rows kept per stratum, so the weighted
+    sample reproduces the full history's class balance.
+    """
+
+    def __init__(self, capacity=PER_STRATUM, negative_rate=NEGATIVE_RATE, seed=42):
+        self.capacity = capacity
+        self.negative_rate = negative_rate
+        self.rng = np.random.default_rng(seed)
+        self.reservoir = None
+        self.seen = None
+
+    @staticmethod
+    def strata(df):
+        if "month" not in df:
+            df = df.assign(month=df["timestamp"].str[:7])
+        if "archetype" not in df:
+            df = df.assign(archetype="unknown")
+        return df
+
+    def update(self, df):
+        df = self.strata(df)
+        counts = df.groupby(STRATA).size()
+        self.seen = counts if self.seen is None else self.seen.add(counts, fill_value=0).astype(np.int64)
+
+        if self.negative_rate < 1.0:
+            keep = (df["impulse_label"] == 1) | (self.rng.random(len(df)) < self.negative_rate)
+            df = df[keep]
+        df = df.assign(_key=self.rng.random(len(df)))
+
+        pool = df if self.reservoir is None else pd.concat([self.reservoir, df], ignore_index=True)
+        pool = pool.sort_values(STRATA + ["_key"], kind="stable")
+        self.reservoir = pool[pool.groupby(STRATA).cumcount() < self.capacity]
+
+    def sample(self):
+        kept = self.reservoir.groupby(STRATA).size()
+        weights = (self.seen / kept).rename("sample_weight")
+        out = self.reservoir.drop(columns="_key").join(weights, on=STRATA)
+        return out.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+# ─── MAIN ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Stratified reservoir sample for training.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--out", default=OUTPUT_PATH)
+    parser.add_argument("--per-stratum", type=int, default=PER_STRATUM,
+                        help="reservoir size per (label, archetype, month) stratum")
+    parser.add_argument("--negative-rate", type=float, default=NEGATIVE_RATE,
+                        help="keep this fraction of non-impulse rows before sampling")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sampler = StratifiedReservoir(args.per_stratum, args.negative_rate, args.seed)
+    for batch in pd.read_csv(args.data, chunksize=args.chunk_size):
+        sampler.update(batch)
+    sample = sampler.sample()
+    sample.to_csv(args.out, index=False)
+
+    total = int(sampler.seen.sum())
+    print(f"✅ Sampled {len(sample)} of {total} records ({len(sample) / max(total, 1):.1%})")
+    print(f"   Strata: {len(sampler.seen)}")
+    print(f"   Impulse share — sample: {sample['impulse_label'].mean():.1%}, "
+          f"weighted: {np.average(sample['impulse_label'], weights=sample['sample_weight']):.1%}")
+    print(f"📁 Saved to: {args.out}")
+
+if __name__ == "__main__":
+    main()
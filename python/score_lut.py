@@ -0,0 +1,280 @@
+import json
+import os
+import numpy as np
+from features import ARTIFACTS, CONTINUOUS_FEATURES, MODEL_OUT, MODEL_FEATURES, load_json
+
+# ─── CONFIG ───────────────────────────────────────────
+LUT_META = os.path.join(MODEL_OUT, "score_lut.json")
+LUT_TABLE = os.path.join(MODEL_OUT, "score_lut.bin")
+# Written on every export, including the ones that are refused
+LUT_REPORT = os.path.join(ARTIFACTS, "score_lut_report.json")
+
+# 4M uint8 cells keeps the app asset at ~4 MB
+MAX_CELLS = 1 << 22
+EVAL_BATCH = 1 << 18
+QUANT_LEVELS = 255
+
+# Training rows used to measure how much binning each axis costs
+ALLOC_SAMPLE = 5000
+
+# The table only ships when it tracks the model this closely on held-out rows
+MAX_P99_ERROR = 0.05
+MAX_ERROR_BOUND = 0.25
+
+# Features that are fully determined by another input are not table axes;
+# they are recomputed from their source for every cell.
+DERIVED = {
+    "is_late_night": "hour",
+    "hour_bucket": "hour",
+    "is_end_of_month": "day_of_month",
+    "is_weekend": "day_of_week",
+}
+AXES = [f for f in MODEL_FEATURES if f not in DERIVED]
+
+# Integer-valued axes have their thresholds snapped to half-integers, which
+# is exact for integer inputs
+DISCRETE = [a for a in AXES if a not in CONTINUOUS_FEATURES]
+
+# Bin edges the source axes need so derived features stay exact
+REQUIRED_EDGES = {
+    "hour": [3.5, 6.5, 12.5, 18.5, 22.5],
+    "day_of_month": [25.5],
+    "day_of_week": [4.5],
+}
+
+# ─── HELPERS ──────────────────────────────────────────
+def derive(cols):
+    """Fill the derived features in a {feature: array} dict from their sources."""
+    hour = cols["hour"]
+    cols["is_late_night"] = ((hour >= 23) | (hour <= 3)).astype(np.float64)
+    # Same buckets as engineer_features: (-1,6], (6,12], (12,18], (18,23]
+    cols["hour_bucket"] = np.digitize(hour, [6, 12, 18], right=True).astype(np.float64)
+    cols["is_end_of_month"] = (cols["day_of_month"] >= 26).astype(np.float64)
+    cols["is_weekend"] = (cols["day_of_week"] >= 5).astype(np.float64)
+    return cols
+
+def raw_threshold(name, j, split, mean, scale):
+    """A booster split threshold for feature j, converted back to raw units."""
+    raw = split * scale[j] + mean[j]
+    if name in DISCRETE:
+        # For integer x, `x < t` is `x < ceil(t) - 0.5`; snapping merges
+        # thresholds that fall between the same two integers. Rounding
+        # first absorbs float error from unscaling an integer threshold.
+        raw = np.ceil(np.round(raw, 6)) - 0.5
+    return float(raw)
+
+def split_gains(booster, mean, scale):
+    """{axis: {raw threshold: total split gain}} over every tree of the booster."""
+    gains = {a: {} for a in AXES}
+    trees = booster.trees_to_dataframe()
+    for row in trees[trees["Feature"] != "Leaf"].itertuples():
+        j = int(row.Feature[1:])
+        name = MODEL_FEATURES[j]
+        if name in gains:
+            t = raw_threshold(name, j, row.Split, mean, scale)
+            gains[name][t] = gains[name].get(t, 0.0) + row.Gain
+    return gains
+
+def ranked_edges(gains, axis):
+    """Required edges first, then the axis's thresholds by descending gain."""
+    required = REQUIRED_EDGES.get(axis, [])
+    rest = sorted((t for t in gains[axis] if t not in required), key=lambda t: -gains[axis][t])
+    return list(required) + rest
+
+def representatives(edges, values):
+    """One input value per bin: the training median, else the bin midpoint.
+
+    `values` must be sorted, so each bin is a contiguous slice.
+    """
+    lo = np.concatenate([[edges[0] - 1.0 if len(edges) else 0.0], edges])
+    hi = np.concatenate([edges, [edges[-1] + 1.0 if len(edges) else 0.0]])
+    reps = (lo + hi) / 2
+    bounds = np.concatenate([[0], np.searchsorted(values, edges, side="right"), [len(values)]])
+    start, stop = bounds[:-1], bounds[1:]
+    filled = stop > start
+    reps[filled] = values[(start[filled] + stop[filled] - 1) // 2]
+    return reps
+
+def binned(X, axis, edges, reps):
+    """X with one axis replaced by its bin representatives and derived columns redone."""
+    j = MODEL_FEATURES.index(axis)
+    X = X.copy()
+    X[:, j] = reps[np.searchsorted(edges, X[:, j], side="right")]
+    cols = derive({f: X[:, i] for i, f in enumerate(MODEL_FEATURES)})
+    return np.column_stack([cols[f] for f in MODEL_FEATURES])
+
+def allocate(booster, gains, col, sample, mean, scale, max_cells):
+    """Choose how many top-gain edges each axis keeps within max_cells.
+
+    Each axis is tried at 1, 2, 4, ... of its best edges with every other
+    axis exact, and the mean error on `sample` is measured. Starting from the
+    required edges, cells then go greedily to the axis step that removes the
+    most error per doubling of the table.
+    """
+    predict = lambda X: booster.inplace_predict((X - mean) / scale)
+    base = predict(sample)
+    options = {}
+    for a in AXES:
+        ranked = ranked_edges(gains, a)
+        n_req = len(REQUIRED_EDGES.get(a, []))
+        extra = len(ranked) - n_req
+        counts = sorted({n_req} | {n_req + min(2 ** i, extra) for i in range(extra.bit_length() + 1)})
+        options[a] = []
+        for n in counts:
+            e = np.array(sorted(ranked[:n]))
+            err = np.abs(predict(binned(sample, a, e, representatives(e, col[a]))) - base).mean()
+            options[a].append((n, float(err)))
+
+    level = {a: 0 for a in AXES}
+    bins = lambda a, l: options[a][l][0] + 1
+    cells = lambda: np.prod([bins(a, level[a]) for a in AXES], dtype=np.float64)
+    while True:
+        best = None
+        for a in AXES:
+            err0 = options[a][level[a]][1]
+            for l in range(level[a] + 1, len(options[a])):
+                growth = bins(a, l) / bins(a, level[a])
+                if cells() * growth > max_cells:
+                    break
+                gain = (err0 - options[a][l][1]) / np.log(growth)
+                if gain > 0 and (best is None or gain > best[0]):
+                    best = (gain, a, l)
+        if best is None:
+            break
+        level[best[1]] = best[2]
+    return {a: np.array(sorted(ranked_edges(gains, a)[:options[a][level[a]][0]])) for a in AXES}
+
+def error_bound(booster, edges, mean, scale):
+    """Worst-case |table - model| over all inputs, from the thresholds the table dropped.
+
+    Inside one cell a tree follows a fixed path until it reaches a split the
+    table dropped, then may end at any leaf below it; summing each tree's
+    widest such leaf range bounds the margin error. The sigmoid is
+    1/4-Lipschitz, and uint8 quantization adds half a level. The result is
+    capped just above 1, where it no longer says anything.
+    """
+    kept = {a: set(edges[a].tolist()) for a in AXES}
+    trees = booster.trees_to_dataframe()
+    margin = 0.0
+    for _, tree in trees.groupby("Tree"):
+        lo, hi, worst = {}, {}, 0.0
+        # Children always have higher node numbers than their parent
+        for row in tree.sort_values("Node", ascending=False).itertuples():
+            if row.Feature == "Leaf":
+                lo[row.ID] = hi[row.ID] = row.Gain
+                continue
+            lo[row.ID] = min(lo[row.Yes], lo[row.No])
+            hi[row.ID] = max(hi[row.Yes], hi[row.No])
+            j = int(row.Feature[1:])
+            name = MODEL_FEATURES[j]
+            if name in kept and raw_threshold(name, j, row.Split, mean, scale) not in kept[name]:
+                worst = max(worst, hi[row.ID] - lo[row.ID])
+        margin += worst
+    return min(margin / 4, 1.0) + 0.5 / QUANT_LEVELS
+
+# ─── BUILD ────────────────────────────────────────────
+def build_lut(booster, X_raw, scaler, max_cells=MAX_CELLS):
+    """Evaluate the booster over a discretized grid of the model inputs.
+
+    Bins come from the booster's own split thresholds. allocate() decides
+    how many of them each axis keeps, spending max_cells where measured
+    error drops most, and meta["error_bound"] is the resulting worst case.
+    Returns (meta, table) where table is a flat uint8 array.
+    """
+    mean = np.asarray(scaler["mean"])
+    scale = np.asarray(scaler["scale"])
+    col = {f: np.sort(X_raw[:, j]) for j, f in enumerate(MODEL_FEATURES)}
+    gains = split_gains(booster, mean, scale)
+    rng = np.random.default_rng(42)
+    sample = X_raw[rng.choice(len(X_raw), min(ALLOC_SAMPLE, len(X_raw)), replace=False)]
+    edges = allocate(booster, gains, col, sample, mean, scale, max_cells)
+
+    reps = {a: representatives(edges[a], col[a]) for a in AXES}
+    shape = tuple(len(reps[a]) for a in AXES)
+    total = int(np.prod(shape))
+    table = np.empty(total, dtype=np.uint8)
+
+    for start in range(0, total, EVAL_BATCH):
+        idx = np.arange(start, min(start + EVAL_BATCH, total))
+        coords = np.unravel_index(idx, shape)
+        cols = derive({a: reps[a][c] for a, c in zip(AXES, coords)})
+        X = np.column_stack([cols[f] for f in MODEL_FEATURES])
+        prob = booster.inplace_predict((X - mean) / scale)
+        table[start:start + len(idx)] = np.round(prob * QUANT_LEVELS).astype(np.uint8)
+
+    meta = {
+        "features": MODEL_FEATURES,
+        "axes": [{"feature": a, "edges": edges[a].tolist(),
+                  "exact": len(edges[a]) == len(ranked_edges(gains, a))} for a in AXES],
+        "shape": list(shape),
+        "quant_levels": QUANT_LEVELS,
+        "error_bound": round(error_bound(booster, edges, mean, scale), 4),
+        "anomaly_score_default": float(mean[MODEL_FEATURES.index("anomaly_score")]),
+    }
+    return meta, table
+
+def tolerance_failures(meta):
+    """Reasons the table must not ship; empty when it is within tolerance."""
+    failures = []
+    if meta["error"]["p99_abs_error"] > MAX_P99_ERROR:
+        failures.append(f"test p99 error {meta['error']['p99_abs_error']} > {MAX_P99_ERROR}")
+    if meta["error_bound"] > MAX_ERROR_BOUND:
+        failures.append(f"error bound {meta['error_bound']} > {MAX_ERROR_BOUND}")
+    return failures
+
+def save_lut(meta, table):
+    with open(LUT_META, "w") as f:
+        json.dump(meta, f, indent=2)
+    table.tofile(LUT_TABLE)
+
+def remove_lut():
+    """Delete a previously shipped table so the app falls back to its rules."""
+    for path in (LUT_META, LUT_TABLE):
+        if os.path.exists(path):
+            os.remove(path)
+
+def save_report(meta, failures):
+    report = {k: v for k, v in meta.items() if k not in ("axes", "category_map")}
+    report["bins"] = {a["feature"]: len(a["edges"]) + 1 for a in meta["axes"]}
+    report["shipped"] = not failures
+    report["failures"] = failures
+    with open(LUT_REPORT, "w") as f:
+        json.dump(report, f, indent=2)
+
+# ─── LOOKUP ───────────────────────────────────────────
+class ScoreLUT:
+    """Vectorized array-index scoring against the exported table."""
+
+    def __init__(self, meta=None, table=None):
+        if meta is None:
+            meta = load_json("score_lut.json")
+            table = np.fromfile(LUT_TABLE, dtype=np.uint8)
+        self.meta = meta
+        self.edges = [np.asarray(a["edges"]) for a in meta["axes"]]
+        self.cols = [meta["features"].index(a["feature"]) for a in meta["axes"]]
+        self.shape = tuple(meta["shape"])
+        self.table = table.reshape(-1)
+        self.quant = meta["quant_levels"]
+
+    def score(self, X_raw):
+        """Impulse probability for each row of a raw MODEL_FEATURES matrix."""
+        bins = tuple(np.searchsorted(e, X_raw[:, j], side="right")
+                     for e, j in zip(self.edges, self.cols))
+        return self.table[np.ravel_multi_index(bins, self.shape)] / self.quant
+
+def error_report(lut, booster, X_raw, scaler):
+    """Measured absolute error of the table against the real model on X_raw.
+
+    This is an empirical check on held-out rows; meta["error_bound"] is the
+    worst case over all inputs.
+    """
+    mean = np.asarray(scaler["mean"])
+    scale = np.asarray(scaler["scale"])
+    err = np.abs(lut.score(X_raw) - booster.inplace_predict((X_raw - mean) / scale))
+    return {
+        "rows": int(len(err)),
+        "max_abs_error": round(float(err.max()), 4),
+        "p99_abs_error": round(float(np.quantile(err, 0.99)), 4),
+        "mean_abs_error": round(float(err.mean()), 4),
+        "quantization_bound": round(0.5 / lut.quant, 4),
+    }
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import os
@@ -9,169 +10,263 @@ from sklearn.ensemble import IsolationForest
 from sklearn.metrics import classification_report, roc_auc_score
 from xgboost import XGBClassifier
 import tensorflow as tf
+from features import DATA_PATH, MODEL_OUT, ARTIFACTS, FEATURES, ARCHETYPE_MAP, engineer_features
+from score_lut import LUT_REPORT, ScoreLUT, build_lut, error_report, remove_lut, save_lut, save_report, tolerance_failures
+from drift_monitor import BASELINE_PATH, build_baseline, save_baseline
+
+# Each stage reads and writes a shared ctx dict, so pipeline.py can run the
+# independent ones concurrently; running this file executes them in order.
 
 # ─── PATHS ────────────────────────────────────────────
-BASE = os.path.dirname(__file__)
-DATA_PATH = os.path.join(BASE, "data", "transactions.csv")
-MODEL_OUT = os.path.join(BASE, "..", "assets", "models")
 os.makedirs(MODEL_OUT, exist_ok=True)
-
-# ─── LOAD DATA ────────────────────────────────────────
-print("📂 Loading dataset...")
-df = pd.read_csv(DATA_PATH)
-print(f"   {len(df)} records loaded")
-
-# ─── FEATURE ENGINEERING ──────────────────────────────
-print("\n⚙️  Engineering features...")
-
-# Encode category
-category_map = {c: i for i, c in enumerate(df["category"].unique())}
-df["category_encoded"] = df["category"].map(category_map)
-
-# Encode archetype
-archetype_map = {"controlled": 0, "night_owl": 1, "eom_spender": 2, "freq_binger": 3}
-df["archetype_encoded"] = df["archetype"].map(archetype_map)
-
-# Spend ratio vs user average
-df["spend_ratio"] = df["amount"] / df["avg_user_spend"]
-
-# Hour buckets: morning/afternoon/evening/night
-df["hour_bucket"] = pd.cut(df["hour"],
-    bins=[-1, 6, 12, 18, 23],
-    labels=[0, 1, 2, 3]).astype(int)
-
-# Normalized gap (cap at 999)
-df["gap_normalized"] = df["transaction_gap_minutes"].clip(upper=999) / 999
-
-FEATURES = [
-    "hour", "day_of_week", "day_of_month",
-    "is_late_night", "is_end_of_month", "is_weekend",
-    "spending_velocity", "gap_normalized",
-    "category_switch_count", "mood_proxy_score",
-    "spend_ratio", "category_encoded", "hour_bucket"
-]
-
-X = df[FEATURES].values
-y = df["impulse_label"].values
-
-# ─── ANOMALY DETECTION (Isolation Forest) ─────────────
-print("\n🔍 Training Isolation Forest (anomaly detection)...")
-iso = IsolationForest(n_estimators=100, contamination=0.15, random_state=42)
-iso.fit(X)
-df["anomaly_score"] = iso.decision_function(X)
-df["is_anomaly"] = (iso.predict(X) == -1).astype(int)
-
-anomaly_rate = df["is_anomaly"].mean()
-print(f"   Anomaly rate detected: {anomaly_rate:.1%}")
-
-# Add anomaly score as extra feature
-X_enriched = np.column_stack([X, df["anomaly_score"].values])
-
-# ─── TRAIN/TEST SPLIT ─────────────────────────────────
-X_train, X_test, y_train, y_test = train_test_split(
-    X_enriched, y, test_size=0.2, random_state=42, stratify=y
-)
-
-# Scale
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+os.makedirs(ARTIFACTS, exist_ok=True)
+METRICS_PATH = os.path.join(ARTIFACTS, "metrics.json")
+
+# ─── LOAD DATA + FEATURES ─────────────────────────────
+def prepare(ctx):
+    print("📂 Loading dataset...")
+    df = pd.read_csv(ctx.get("data_path", DATA_PATH))
+    print(f"   {len(df)} records loaded")
+    if ctx.get("rejected_path"):
+        rejected = np.load(ctx["rejected_path"])
+        df = df.drop(index=rejected).reset_index(drop=True)
+        print(f"   {len(rejected)} quarantined records dropped")
+
+    # Samples from sampling.py carry inverse-probability weights
+    weighted = "sample_weight" in df
+    w = df["sample_weight"].values if weighted else np.ones(len(df))
+
+    print("\n⚙️  Engineering features...")
+
+    # Encode category
+    category_map = {c: i for i, c in enumerate(df["category"].unique())}
+    engineer_features(df, category_map)
+
+    X = df[FEATURES].values
+    y = df["impulse_label"].values
+
+    # ─── ANOMALY DETECTION (Isolation Forest) ─────────
+    print("\n🔍 Training Isolation Forest (anomaly detection)...")
+    iso = IsolationForest(n_estimators=100, contamination=0.15, random_state=42)
+    iso.fit(X, sample_weight=w)
+    df["anomaly_score"] = iso.decision_function(X)
+    df["is_anomaly"] = (iso.predict(X) == -1).astype(int)
+
+    anomaly_rate = df["is_anomaly"].mean()
+    print(f"   Anomaly rate detected: {anomaly_rate:.1%}")
+
+    # Add anomaly score as extra feature
+    X_enriched = np.column_stack([X, df["anomaly_score"].values])
+
+    # ─── TRAIN/TEST SPLIT ─────────────────────────────
+    X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(
+        X_enriched, y, w, test_size=0.2, random_state=42, stratify=y
+    )
+
+    # Scale
+    scaler = StandardScaler()
+    ctx.update(
+        y=y, w=w, weighted=weighted, w_train=w_train, w_test=w_test, iso=iso, category_map=category_map, archetype_map=dict(ARCHETYPE_MAP),
+        X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test,
+        scaler=scaler,
+        X_train_scaled=scaler.fit_transform(X_train),
+        X_test_scaled=scaler.transform(X_test),
+    )
+
+# ─── CPU GRANTS ───────────────────────────────────────
+# Stages take an optional `cpus` grant from pipeline.py; None means no limit.
+def teacher_booster(ctx, cpus=None):
+    """Private copy of the teacher booster, limited to this stage's grant."""
+    booster = ctx["xgb"].get_booster().copy()
+    if cpus:
+        booster.set_param({"nthread": cpus})
+    return booster
+
+def limit_tf_threads(cpus):
+    if not cpus:
+        return
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(cpus)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    except RuntimeError:
+        # TensorFlow is already initialized in this process; its pools are
+        # process-wide and can no longer be resized
+        print("   ⚠️  TensorFlow already initialized; CPU grant not applied")
 
 # ─── XGBOOST CLASSIFIER ───────────────────────────────
-print("\n🤖 Training XGBoost classifier...")
-scale_pos_weight = (y == 0).sum() / (y == 1).sum()
-
-xgb = XGBClassifier(
-    n_estimators=200,
-    max_depth=6,
-    learning_rate=0.1,
-    scale_pos_weight=scale_pos_weight,
-    use_label_encoder=False,
-    eval_metric="logloss",
-    random_state=42
-)
-xgb.fit(X_train_scaled, y_train,
-        eval_set=[(X_test_scaled, y_test)],
-        verbose=False)
-
-y_pred = xgb.predict(X_test_scaled)
-y_prob = xgb.predict_proba(X_test_scaled)[:, 1]
-
-print("\n📊 Classification Report:")
-print(classification_report(y_test, y_pred))
-print(f"🎯 ROC-AUC Score: {roc_auc_score(y_test, y_prob):.4f}")
+def fit_teacher(ctx, cpus=None):
+    print("\n🤖 Training XGBoost classifier...")
+    # The full dataset is re-balanced towards positives. An importance-weighted
+    # sample already stands in for the population, and re-balancing it would
+    # undo the calibration the weights exist for.
+    y = ctx["y"]
+    scale_pos_weight = 1.0 if ctx["weighted"] else (y == 0).sum() / (y == 1).sum()
+
+    xgb = XGBClassifier(
+        n_estimators=200,
+        max_depth=6,
+        learning_rate=0.1,
+        scale_pos_weight=scale_pos_weight,
+        use_label_encoder=False,
+        eval_metric="logloss",
+        random_state=42,
+        n_jobs=cpus,
+    )
+    xgb.fit(ctx["X_train_scaled"], ctx["y_train"],
+            sample_weight=ctx["w_train"],
+            eval_set=[(ctx["X_test_scaled"], ctx["y_test"])],
+            sample_weight_eval_set=[ctx["w_test"]],
+            verbose=False)
+    ctx["xgb"] = xgb
+
+    # Save the teacher models for Python-side scoring and explanations
+    xgb.save_model(os.path.join(ARTIFACTS, "xgb_teacher.json"))
+    with open(os.path.join(ARTIFACTS, "isolation_forest.pkl"), "wb") as f:
+        pickle.dump(ctx["iso"], f)
+    print(f"   ✅ teacher models saved to {ARTIFACTS}")
+
+def evaluate(ctx, cpus=None):
+    X_test_scaled, y_test, w_test = ctx["X_test_scaled"], ctx["y_test"], ctx["w_test"]
+    y_prob = teacher_booster(ctx, cpus).inplace_predict(X_test_scaled)
+    y_pred = (y_prob > 0.5).astype(int)
+    auc = roc_auc_score(y_test, y_prob, sample_weight=w_test)
+
+    print("\n📊 Classification Report:")
+    print(classification_report(y_test, y_pred, sample_weight=w_test))
+    print(f"🎯 ROC-AUC Score: {auc:.4f}")
+
+    with open(METRICS_PATH, "w") as f:
+        json.dump({"roc_auc": float(auc),
+                   "report": classification_report(y_test, y_pred, sample_weight=w_test, output_dict=True)},
+                  f, indent=2)
+
+# ─── EXPORT SCORE LOOKUP TABLE ────────────────────────
+def export_lut(ctx, cpus=None):
+    print("\n🧮 Exporting quantized score lookup table...")
+    booster = teacher_booster(ctx, cpus)
+    scaler = ctx["scaler"]
+    lut_scaler = {"mean": scaler.mean_, "scale": scaler.scale_}
+    lut_meta, lut_table = build_lut(booster, ctx["X_train"], lut_scaler)
+    lut_meta["category_map"] = ctx["category_map"]
+    lut_meta["error"] = error_report(ScoreLUT(lut_meta, lut_table), booster, ctx["X_test"], lut_scaler)
+    print(f"   {lut_table.size} cells, shape {lut_meta['shape']}")
+    print(f"   Worst-case error vs XGBoost: {lut_meta['error_bound']}")
+    print(f"   Measured on test set: max {lut_meta['error']['max_abs_error']}, "
+          f"p99 {lut_meta['error']['p99_abs_error']}, mean {lut_meta['error']['mean_abs_error']}")
+
+    # The app prefers the table whenever it exists, so an inaccurate one is
+    # not shipped at all
+    failures = tolerance_failures(lut_meta)
+    save_report(lut_meta, failures)
+    if failures:
+        remove_lut()
+        print(f"   ⚠️  score_lut not shipped ({'; '.join(failures)}); see {LUT_REPORT}")
+    else:
+        save_lut(lut_meta, lut_table)
+        print("   ✅ score_lut.json + score_lut.bin saved")
 
 # ─── CONVERT TO TFLITE ────────────────────────────────
-print("\n🔄 Converting to TFLite...")
-
-# Build a small TF model that mimics XGBoost probabilities
-input_dim = X_train_scaled.shape[1]
-train_probs = xgb.predict_proba(X_train_scaled)[:, 1].reshape(-1, 1)
-
-tf_model = tf.keras.Sequential([
-    tf.keras.layers.Input(shape=(input_dim,)),
-    tf.keras.layers.Dense(64, activation="relu"),
-    tf.keras.layers.BatchNormalization(),
-    tf.keras.layers.Dropout(0.3),
-    tf.keras.layers.Dense(32, activation="relu"),
-    tf.keras.layers.BatchNormalization(),
-    tf.keras.layers.Dropout(0.2),
-    tf.keras.layers.Dense(16, activation="relu"),
-    tf.keras.layers.Dense(1, activation="sigmoid")
-])
-
-tf_model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
-
-print("   Training distillation model...")
-tf_model.fit(
-    X_train_scaled, train_probs,
-    epochs=30, batch_size=64,
-    validation_split=0.1,
-    verbose=0
-)
-print("   ✅ Distillation complete")
-
-# Convert to TFLite
-converter = tf.lite.TFLiteConverter.from_keras_model(tf_model)
-converter.optimizations = [tf.lite.Optimize.DEFAULT]
-tflite_model = converter.convert()
-
-tflite_path = os.path.join(MODEL_OUT, "impulse_model.tflite")
-with open(tflite_path, "wb") as f:
-    f.write(tflite_model)
-print(f"   ✅ TFLite model saved: {tflite_path}")
+def distill(ctx, cpus=None):
+    print("\n🔄 Distilling for TFLite...")
+    limit_tf_threads(cpus)
+    X_train_scaled = ctx["X_train_scaled"]
+
+    # Build a small TF model that mimics XGBoost probabilities
+    input_dim = X_train_scaled.shape[1]
+    train_probs = teacher_booster(ctx, cpus).inplace_predict(X_train_scaled).reshape(-1, 1)
+
+    tf_model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(input_dim,)),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(16, activation="relu"),
+        tf.keras.layers.Dense(1, activation="sigmoid")
+    ])
+
+    tf_model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
+
+    print("   Training distillation model...")
+    tf_model.fit(
+        X_train_scaled, train_probs,
+        sample_weight=ctx["w_train"],
+        epochs=30, batch_size=64,
+        validation_split=0.1,
+        verbose=0
+    )
+    ctx["tf_model"] = tf_model
+    print("   ✅ Distillation complete")
+
+def convert_tflite(ctx):
+    converter = tf.lite.TFLiteConverter.from_keras_model(ctx["tf_model"])
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    tflite_model = converter.convert()
+
+    tflite_path = os.path.join(MODEL_OUT, "impulse_model.tflite")
+    with open(tflite_path, "wb") as f:
+        f.write(tflite_model)
+    print(f"   ✅ TFLite model saved: {tflite_path}")
 
 # ─── SAVE METADATA ────────────────────────────────────
-print("\n💾 Saving metadata...")
-
-# Save scaler params
-scaler_data = {
-    "mean": scaler.mean_.tolist(),
-    "scale": scaler.scale_.tolist(),
-    "features": FEATURES + ["anomaly_score"]
-}
-with open(os.path.join(MODEL_OUT, "scaler.json"), "w") as f:
-    json.dump(scaler_data, f, indent=2)
-
-# Save category map
-with open(os.path.join(MODEL_OUT, "category_map.json"), "w") as f:
-    json.dump(category_map, f, indent=2)
-
-# Save archetype map
-with open(os.path.join(MODEL_OUT, "archetype_map.json"), "w") as f:
-    json.dump(archetype_map, f, indent=2)
-
-# Save feature importance
-importance = dict(zip(FEATURES, xgb.feature_importances_[:len(FEATURES)]))
-importance_sorted = dict(sorted({k: float(v) for k, v in importance.items()}.items(), key=lambda x: x[1], reverse=True))
-with open(os.path.join(MODEL_OUT, "feature_importance.json"), "w") as f:
-    json.dump(importance_sorted, f, indent=2)
-
-print("   ✅ scaler.json saved")
-print("   ✅ category_map.json saved")
-print("   ✅ feature_importance.json saved")
-
-print("\n🏆 ALL DONE! Files in assets/models/:")
-for f in os.listdir(MODEL_OUT):
-    size = os.path.getsize(os.path.join(MODEL_OUT, f))
-    print(f"   {f} ({size/1024:.1f} KB)")
\ No newline at end of file
+def export_metadata(ctx):
+    print("\n💾 Saving metadata...")
+    scaler, xgb = ctx["scaler"], ctx["xgb"]
+
+    # Save scaler params
+    scaler_data = {
+        "mean": scaler.mean_.tolist(),
+        "scale": scaler.scale_.tolist(),
+        "features": FEATURES + ["anomaly_score"]
+    }
+    with open(os.path.join(MODEL_OUT, "scaler.json"), "w") as f:
+        json.dump(scaler_data, f, indent=2)
+
+    # Save category map
+    with open(os.path.join(MODEL_OUT, "category_map.json"), "w") as f:
+        json.dump(ctx["category_map"], f, indent=2)
+
+    # Save training histograms for drift_monitor.py
+    X_train = ctx["X_train"]
+    save_baseline(build_baseline(X_train, scaler_data, scaler_data["features"],
+                                 X_train[:, FEATURES.index("category_encoded")], len(ctx["category_map"]),
+                                 weights=ctx["w_train"]))
+
+    # Save archetype map
+    with open(os.path.join(MODEL_OUT, "archetype_map.json"), "w") as f:
+        json.dump(ctx["archetype_map"], f, indent=2)
+
+    # Save feature importance
+    importance = dict(zip(FEATURES, xgb.feature_importances_[:len(FEATURES)]))
+    importance_sorted = dict(sorted({k: float(v) for k, v in importance.items()}.items(), key=lambda x: x[1], reverse=True))
+    with open(os.path.join(MODEL_OUT, "feature_importance.json"), "w") as f:
+        json.dump(importance_sorted, f, indent=2)
+
+    print("   ✅ scaler.json saved")
+    print("   ✅ category_map.json saved")
+    print(f"   ✅ drift baseline saved: {BASELINE_PATH}")
+    print("   ✅ feature_importance.json saved")
+
+# ─── MAIN ─────────────────────────────────────────────
+STAGES = [prepare, fit_teacher, evaluate, export_lut, distill, convert_tflite, export_metadata]
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the impulse model and export app assets.")
+    parser.add_argument("--data", default=DATA_PATH,
+                        help="training CSV; a sampling.py sample is weighted by its sample_weight column")
+    parser.add_argument("--rejected", help="validate.py row positions to drop from --data")
+    args = parser.parse_args()
+
+    ctx = {"data_path": args.data, "rejected_path": args.rejected}
+    for stage in STAGES:
+        stage(ctx)
+
+    print("\n🏆 ALL DONE! Files in assets/models/:")
+    for f in os.listdir(MODEL_OUT):
+        size = os.path.getsize(os.path.join(MODEL_OUT, f))
+        print(f"   {f} ({size/1024:.1f} KB)")
+
+if __name__ == "__main__":
+    main()
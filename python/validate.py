@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from features import ARCHETYPE_MAP, BASE, DATA_PATH, load_json
+
+# ─── CONFIG ───────────────────────────────────────────
+# Positions of quarantined rows in the source CSV, for prepare() to drop
+REJECTED_PATH = os.path.join(BASE, "data", "transactions.rejected.npy")
+QUARANTINE_PATH = os.path.join(BASE, "data", "transactions.quarantine.csv")
+REPORT_PATH = os.path.join(BASE, "data", "validation_report.json")
+CHUNK_SIZE = 1_000_000
+MAX_REJECT_RATE = 0.01
+GAP_SENTINEL = 999
+
+NUMERIC = [
+    "hour", "day_of_week", "day_of_month", "amount", "avg_user_spend",
+    "is_late_night", "is_end_of_month", "is_weekend", "spending_velocity",
+    "transaction_gap_minutes", "category_switch_count", "mood_proxy_score",
+]
+REQUIRED = ["user_id", "timestamp", "category"] + NUMERIC
+# Read as strings; numeric columns are parsed by read_csv and only
+# re-parsed when a chunk holds a non-numeric value
+STRINGS = {c: str for c in ["user_id", "timestamp", "category", "archetype"]}
+
+# (column, low, high) inclusive bounds
+RANGES = [
+    ("hour", 0, 23), ("day_of_week", 0, 6), ("day_of_month", 1, 31),
+    ("is_late_night", 0, 1), ("is_end_of_month", 0, 1), ("is_weekend", 0, 1),
+    ("spending_velocity", 0, np.inf), ("transaction_gap_minutes", 0, np.inf),
+    ("category_switch_count", 1, np.inf), ("mood_proxy_score", 0, 1.5),
+    ("impulse_label", 0, 1),
+]
+
+# One bit per reason; WARNINGS are reported but rows are kept. Training
+# rebuilds the category map from the data, so a category the last model
+# has not seen is new rather than invalid.
+REASONS = [
+    "NULL", "BAD_TYPE", "OUT_OF_RANGE", "NON_POSITIVE_AMOUNT", "ZERO_AVG_SPEND",
+    "UNKNOWN_CATEGORY", "UNKNOWN_ARCHETYPE", "BAD_TIMESTAMP", "LATE_NIGHT_MISMATCH",
+    "GAP_SENTINEL",
+]
+BIT = {r: np.int64(1 << i) for i, r in enumerate(REASONS)}
+WARNINGS = {"GAP_SENTINEL", "UNKNOWN_CATEGORY"}
+ERROR_MASK = np.int64(sum(int(BIT[r]) for r in REASONS if r not in WARNINGS))
+
+# ─── CHECKS ───────────────────────────────────────────
+class SchemaError(ValueError):
+    pass
+
+def check_schema(columns):
+    missing = [c for c in REQUIRED if c not in columns]
+    if missing:
+        raise SchemaError(f"missing required columns: {', '.join(missing)}")
+
+def validate_frame(df, category_map):
+    """Return an int64 reason bitmask per row; 0 means clean."""
+    n = len(df)
+    mask = np.zeros(n, dtype=np.int64)
+
+    def flag(cond, reason):
+        nonlocal mask
+        mask |= np.where(np.asarray(cond, dtype=bool), BIT[reason], 0)
+
+    for col in ["user_id", "timestamp", "category"]:
+        flag(df[col].isna(), "NULL")
+
+    num = {}
+    for col in NUMERIC + (["impulse_label"] if "impulse_label" in df else []):
+        raw = df[col]
+        num[col] = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+        flag(raw.isna(), "NULL")
+        flag(np.isnan(num[col]) & raw.notna().to_numpy(), "BAD_TYPE")
+
+    for col, low, high in RANGES:
+        if col in num:
+            v = num[col]
+            flag(~np.isnan(v) & ((v < low) | (v > high)), "OUT_OF_RANGE")
+
+    flag(num["amount"] <= 0, "NON_POSITIVE_AMOUNT")
+    # spend_ratio = amount / avg_user_spend would be inf or NaN
+    flag(num["avg_user_spend"] <= 0, "ZERO_AVG_SPEND")
+    flag(df["category"].notna() & ~df["category"].isin(list(category_map)), "UNKNOWN_CATEGORY")
+    if "archetype" in df:
+        flag(df["archetype"].notna() & ~df["archetype"].isin(list(ARCHETYPE_MAP)), "UNKNOWN_ARCHETYPE")
+
+    ts = pd.to_datetime(df["timestamp"], errors="coerce", format="ISO8601")
+    flag(df["timestamp"].notna() & ts.isna(), "BAD_TIMESTAMP")
+
+    hour = num["hour"]
+    expected_late = (hour >= 23) | (hour <= 3)
+    flag(~np.isnan(hour) & (num["is_late_night"] != expected_late), "LATE_NIGHT_MISMATCH")
+
+    # 999 marks a user's first transaction but also equals the gap_normalized
+    # cap, so sentinel rows are counted separately from real long gaps
+    flag(num["transaction_gap_minutes"] == GAP_SENTINEL, "GAP_SENTINEL")
+    return mask
+
+def describe(masks):
+    """Map each distinct bitmask to its 'A|B' reason string."""
+    return {int(m): "|".join(r for r in REASONS if int(m) & int(BIT[r])) for m in np.unique(masks)}
+
+# ─── MAIN ─────────────────────────────────────────────
+def run(src, rejected_path=REJECTED_PATH, quarantine_path=QUARANTINE_PATH,
+        report_path=REPORT_PATH, chunk_size=CHUNK_SIZE):
+    category_map = load_json("category_map.json")
+    counts = {r: 0 for r in REASONS}
+    total = rejected = 0
+    rejected_rows = []
+
+    for i, batch in enumerate(pd.read_csv(src, chunksize=chunk_size, dtype=STRINGS)):
+        if i == 0:
+            check_schema(batch.columns)
+        masks = validate_frame(batch, category_map)
+        for r in REASONS:
+            counts[r] += int(np.count_nonzero(masks & BIT[r]))
+
+        bad = (masks & ERROR_MASK) != 0
+        rejected_rows.append(total + np.flatnonzero(bad))
+        total += len(batch)
+        rejected += int(bad.sum())
+
+        # Only failing rows are written; clean rows stay in the source file
+        first = i == 0
+        quarantine = batch[bad].assign(reject_reasons=pd.Series(masks[bad]).map(describe(masks[bad])).to_numpy())
+        quarantine.to_csv(quarantine_path, mode="w" if first else "a", header=first, index=False)
+
+    np.save(rejected_path, np.concatenate(rejected_rows or [np.empty(0, dtype=np.int64)]))
+    report = {
+        "source": os.path.abspath(src),
+        "rows": total,
+        "clean": total - rejected,
+        "quarantined": rejected,
+        "reject_rate": round(rejected / max(total, 1), 6),
+        "reasons": counts,
+        "warnings": sorted(WARNINGS),
+    }
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate transactions and quarantine bad rows.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--rejected", default=REJECTED_PATH, help="where to save quarantined row positions")
+    parser.add_argument("--quarantine", default=QUARANTINE_PATH)
+    parser.add_argument("--report", default=REPORT_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-reject-rate", type=float, default=MAX_REJECT_RATE,
+                        help="exit 1 when more than this fraction of rows is quarantined")
+    args = parser.parse_args()
+
+    report = run(args.data, args.rejected, args.quarantine, args.report, args.chunk_size)
+    print(f"🔎 Validated {report['rows']} records")
+    print(f"   ✅ clean: {report['clean']}   🚫 quarantined: {report['quarantined']} "
+          f"({report['reject_rate']:.2%})")
+    for reason, count in report["reasons"].items():
+        if count:
+            print(f"   {reason}: {count}{' (warning)' if reason in WARNINGS else ''}")
+    print(f"📁 Report: {args.report}")
+    if report["reject_rate"] > args.max_reject_rate:
+        print(f"❌ Reject rate above {args.max_reject_rate:.2%}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()